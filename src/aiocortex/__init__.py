@@ -1,4 +1,12 @@
-"""aiocortex — Async Python library for Home Assistant configuration management."""
+"""aiocortex — Async Python library for Home Assistant configuration management.
+
+Only the version and the exception hierarchy are imported eagerly; every other
+public name is loaded from its submodule on first access, so importing the
+package does not pull in dulwich, PyYAML or pydantic until they are needed.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
 
 from ._version import __version__
 from .exceptions import (
@@ -9,43 +17,83 @@ from .exceptions import (
     PathSecurityError,
     YAMLParseError,
 )
-from .files import AsyncFileManager, YAMLEditor
-from .git import GitManager
-from .instructions import (
-    async_load_all_instructions,
-    async_load_instruction_file,
-    get_instruction_files,
-    load_all_instructions,
-    load_instruction_file,
-)
-from .models import (
-    AutomationConfig,
-    CheckpointResult,
-    CleanupResult,
-    CommitInfo,
-    CortexResponse,
-    FileAppendResult,
-    FileDeleteResult,
-    FileInfo,
-    FilePathResult,
-    FileWriteResult,
-    HelperSpec,
-    PendingChanges,
-    PendingChangesSummary,
-    RestoreFilesResult,
-    RollbackResult,
-    ScriptConfig,
-    ServiceCallSpec,
-    TransactionAbortResult,
-    TransactionCommitResult,
-    TransactionOperation,
-    TransactionRollbackMetadata,
-    TransactionState,
-    TransactionValidationResult,
-    YAMLConflict,
-    YAMLPatchOperation,
-    YAMLPatchPreview,
-)
+
+if TYPE_CHECKING:
+    from .files import AsyncFileManager, YAMLEditor
+    from .git import GitManager
+    from .instructions import (
+        async_load_all_instructions,
+        async_load_instruction_file,
+        get_instruction_files,
+        load_all_instructions,
+        load_instruction_file,
+    )
+    from .models import (
+        AutomationConfig,
+        CheckpointResult,
+        CleanupResult,
+        CommitInfo,
+        CortexResponse,
+        FileAppendResult,
+        FileDeleteResult,
+        FileInfo,
+        FilePathResult,
+        FileWriteResult,
+        HelperSpec,
+        PendingChanges,
+        PendingChangesSummary,
+        RestoreFilesResult,
+        RollbackResult,
+        ScriptConfig,
+        ServiceCallSpec,
+        TransactionAbortResult,
+        TransactionCommitResult,
+        TransactionOperation,
+        TransactionRollbackMetadata,
+        TransactionState,
+        TransactionValidationResult,
+        YAMLConflict,
+        YAMLPatchOperation,
+        YAMLPatchPreview,
+    )
+
+# Public name -> submodule that defines it, imported on first access (PEP 562)
+_LAZY_IMPORTS: dict[str, str] = {
+    "AsyncFileManager": ".files",
+    "YAMLEditor": ".files",
+    "GitManager": ".git",
+    "async_load_all_instructions": ".instructions",
+    "async_load_instruction_file": ".instructions",
+    "get_instruction_files": ".instructions",
+    "load_all_instructions": ".instructions",
+    "load_instruction_file": ".instructions",
+    "AutomationConfig": ".models",
+    "CheckpointResult": ".models",
+    "CleanupResult": ".models",
+    "CommitInfo": ".models",
+    "CortexResponse": ".models",
+    "FileAppendResult": ".models",
+    "FileDeleteResult": ".models",
+    "FileInfo": ".models",
+    "FilePathResult": ".models",
+    "FileWriteResult": ".models",
+    "HelperSpec": ".models",
+    "PendingChanges": ".models",
+    "PendingChangesSummary": ".models",
+    "RestoreFilesResult": ".models",
+    "RollbackResult": ".models",
+    "ScriptConfig": ".models",
+    "ServiceCallSpec": ".models",
+    "TransactionAbortResult": ".models",
+    "TransactionCommitResult": ".models",
+    "TransactionOperation": ".models",
+    "TransactionRollbackMetadata": ".models",
+    "TransactionState": ".models",
+    "TransactionValidationResult": ".models",
+    "YAMLConflict": ".models",
+    "YAMLPatchOperation": ".models",
+    "YAMLPatchPreview": ".models",
+}
 
 __all__ = [
     "AsyncFileManager",
@@ -90,3 +138,17 @@ __all__ = [
     "load_all_instructions",
     "load_instruction_file",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
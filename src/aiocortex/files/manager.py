@@ -8,7 +8,17 @@ orchestrating git commits after file operations.
 
 from __future__ import annotations
 
+import asyncio
+import fnmatch
+import functools
 import logging
+import os
+import pickle
+import re
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
@@ -28,12 +38,31 @@ from .yaml_editor import YAMLEditor
 
 logger = logging.getLogger(__name__)
 
+# Prefer the LibYAML-backed loader; PyYAML builds without it fall back to pure Python
+_SafeLoader: type[yaml.SafeLoader] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Maximum number of parsed YAML documents kept by ``parse_yaml``
+_YAML_CACHE_SIZE = 64
+
+_YAML_SUFFIXES: tuple[str, ...] = (".yaml", ".yml")
+
+# Shared by every AsyncFileManager that isn't given its own executor, so file
+# I/O does not compete with unrelated work on the loop's default executor.
+_SHARED_IO_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="aiocortex-io")
+
 
 class AsyncFileManager:
     """Safe async file operations restricted to a *config_path* directory."""
 
-    def __init__(self, config_path: Path) -> None:
+    def __init__(self, config_path: Path, *, executor: Executor | None = None) -> None:
         self.config_path = config_path.resolve()
+        self._executor = executor or _SHARED_IO_EXECUTOR
+        self._config_str = str(self.config_path)
+        # Trailing separator so ``/configXYZ`` is not mistaken for a child path
+        self._config_prefix = os.path.join(self._config_str, "")
+        # full path -> (st_mtime_ns, st_size, pickled parsed data); a pickle
+        # round-trip hands out private copies far faster than ``copy.deepcopy``
+        self._yaml_cache: OrderedDict[str, tuple[int, int, bytes]] = OrderedDict()
 
     # ------------------------------------------------------------------
     # Path helpers
@@ -52,12 +81,87 @@ class AsyncFileManager:
         if relative_path.startswith("/"):
             relative_path = relative_path[1:]
 
-        full_path = (self.config_path / relative_path).resolve()
+        full_path = os.path.realpath(os.path.join(self._config_str, relative_path))
 
-        if not str(full_path).startswith(str(self.config_path)):
+        if full_path != self._config_str and not full_path.startswith(self._config_prefix):
             raise PathSecurityError(f"Path outside config directory: {relative_path}")
 
-        return full_path
+        return Path(full_path)
+
+    def _invalidate_yaml_cache(self, full_path: Path) -> None:
+        self._yaml_cache.pop(str(full_path), None)
+
+    # ------------------------------------------------------------------
+    # Blocking helpers — run on the I/O executor
+    # ------------------------------------------------------------------
+
+    async def _run_blocking[T](self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run *func* on this manager's I/O executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def _list_files_sync(self, dir_path: Path, pattern: str) -> list[FileInfo]:
+        """Recursively collect :class:`FileInfo` for files under *dir_path*, sorted by path."""
+        if not dir_path.is_dir():
+            return []
+
+        match_name = None if pattern == "*" else re.compile(fnmatch.translate(pattern)).match
+        prefix_len = len(self._config_prefix)
+        # Plain tuples while walking; models are only built once, after sorting
+        entries_found: list[tuple[str, str, int, float, bool]] = []
+        root = str(dir_path)
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = os.scandir(current)
+            except OSError as exc:
+                if current == root:
+                    raise
+                # Skip an unreadable subdirectory rather than failing the listing
+                logger.debug("Failed to scan %s: %s", current, exc)
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    name = entry.name
+                    if not entry.is_file() or (match_name and not match_name(name)):
+                        continue
+                    stat = entry.stat()
+                    entries_found.append(
+                        (
+                            entry.path[prefix_len:],
+                            name,
+                            stat.st_size,
+                            stat.st_mtime,
+                            name.endswith(_YAML_SUFFIXES),
+                        )
+                    )
+
+        entries_found.sort(key=itemgetter(0))
+        # Values come straight from ``os.stat`` with the declared types, so skip
+        # per-entry validation
+        return [
+            FileInfo.model_construct(
+                path=path, name=name, size=size, modified=modified, is_yaml=is_yaml
+            )
+            for path, name, size, modified, is_yaml in entries_found
+        ]
+
+    @staticmethod
+    def _load_yaml_sync(raw: bytes) -> tuple[dict[str, Any], bytes]:
+        """Parse *raw* YAML, returning the data and its pickle for the cache."""
+        data = yaml.load(raw, Loader=_SafeLoader) or {}
+        return data, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _delete_file_sync(full_path: Path, file_path: str) -> None:
+        """Unlink *full_path*, raising ``FileNotFoundError`` if it is missing."""
+        if not full_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        full_path.unlink()
 
     # ------------------------------------------------------------------
     # Public API
@@ -68,29 +172,10 @@ class AsyncFileManager:
         directory: str = "",
         pattern: str = "*",
     ) -> list[FileInfo]:
-        """List files in *directory* matching *pattern* (recursive glob)."""
+        """List files under *directory* whose names match *pattern* (recursive)."""
         try:
             dir_path = self._get_full_path(directory)
-
-            if not dir_path.exists():
-                return []
-
-            files: list[FileInfo] = []
-            for item in dir_path.rglob(pattern):
-                if item.is_file():
-                    rel_path = item.relative_to(self.config_path)
-                    stat = item.stat()
-                    files.append(
-                        FileInfo(
-                            path=str(rel_path),
-                            name=item.name,
-                            size=stat.st_size,
-                            modified=stat.st_mtime,
-                            is_yaml=item.suffix in (".yaml", ".yml"),
-                        )
-                    )
-
-            return sorted(files, key=lambda file_info: file_info.path)
+            return await self._run_blocking(self._list_files_sync, dir_path, pattern)
         except PathSecurityError:
             raise
         except Exception as exc:
@@ -105,10 +190,11 @@ class AsyncFileManager:
             if not full_path.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
 
-            async with aiofiles.open(full_path, encoding="utf-8") as fh:
+            async with aiofiles.open(full_path, encoding="utf-8", executor=self._executor) as fh:
                 content = await fh.read()
 
-            logger.info("Read file: %s (%d bytes)", file_path, len(content))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Read file: %s (%d bytes)", file_path, len(content))
             return content
         except (FileNotFoundError, PathSecurityError):
             raise
@@ -128,12 +214,16 @@ class AsyncFileManager:
         """
         try:
             full_path = self._get_full_path(file_path)
-            full_path.parent.mkdir(parents=True, exist_ok=True)
+            self._invalidate_yaml_cache(full_path)
+            await self._run_blocking(full_path.parent.mkdir, parents=True, exist_ok=True)
 
-            async with aiofiles.open(full_path, "w", encoding="utf-8") as fh:
+            async with aiofiles.open(
+                full_path, "w", encoding="utf-8", executor=self._executor
+            ) as fh:
                 await fh.write(content)
 
-            logger.info("Wrote file: %s (%d bytes)", file_path, len(content))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Wrote file: %s (%d bytes)", file_path, len(content))
 
             return FileWriteResult(success=True, path=file_path, size=len(content))
         except PathSecurityError:
@@ -146,26 +236,29 @@ class AsyncFileManager:
         """Append *content* to *file_path*, creating it if it doesn't exist."""
         try:
             full_path = self._get_full_path(file_path)
+            self._invalidate_yaml_cache(full_path)
 
-            if not full_path.exists():
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                full_path.touch()
-
-            async with aiofiles.open(full_path, encoding="utf-8") as fh:
-                existing = await fh.read()
+            await self._run_blocking(full_path.parent.mkdir, parents=True, exist_ok=True)
 
-            new_content = (existing + "\n" + content) if existing else content
+            # Append mode creates the file if needed and starts at EOF, so the
+            # existing size comes from tell() — no probe, no re-read
+            async with aiofiles.open(
+                full_path, "a", encoding="utf-8", executor=self._executor
+            ) as fh:
+                separator = "\n" if await fh.tell() else ""
+                await fh.write(separator + content)
+                total_size = await fh.tell()
 
-            async with aiofiles.open(full_path, "w", encoding="utf-8") as fh:
-                await fh.write(new_content)
-
-            logger.info("Appended to file: %s (%d bytes)", file_path, len(content))
+            # Both sizes in UTF-8 bytes, the unit tell() reports
+            added_bytes = len(content.encode("utf-8"))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Appended to file: %s (%d bytes)", file_path, added_bytes)
 
             return FileAppendResult(
                 success=True,
                 path=file_path,
-                added_bytes=len(content),
-                total_size=len(new_content),
+                added_bytes=added_bytes,
+                total_size=total_size,
             )
         except PathSecurityError:
             raise
@@ -180,12 +273,11 @@ class AsyncFileManager:
         """
         try:
             full_path = self._get_full_path(file_path)
+            self._invalidate_yaml_cache(full_path)
 
-            if not full_path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-
-            full_path.unlink()
-            logger.info("Deleted file: %s", file_path)
+            await self._run_blocking(self._delete_file_sync, full_path, file_path)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Deleted file: %s", file_path)
 
             return FileDeleteResult(success=True, path=file_path)
         except (FileNotFoundError, PathSecurityError):
@@ -195,14 +287,46 @@ class AsyncFileManager:
             raise FileError(str(exc)) from exc
 
     async def parse_yaml(self, file_path: str) -> dict[str, Any]:
-        """Parse a YAML file and return its contents as a dict."""
+        """Parse a YAML file and return its contents as a dict.
+
+        Results are cached per file and reused while its mtime and size are
+        unchanged; callers always receive their own copy.
+        """
         try:
-            content = await self.read_file(file_path)
-            data = yaml.safe_load(content)
-            return data or {}
+            full_path = self._get_full_path(file_path)
+            cache_key = str(full_path)
+
+            try:
+                stat = await self._run_blocking(os.stat, full_path)
+            except FileNotFoundError:
+                self._yaml_cache.pop(cache_key, None)
+                raise FileNotFoundError(f"File not found: {file_path}") from None
+
+            cached = self._yaml_cache.get(cache_key)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._yaml_cache.move_to_end(cache_key)
+                data: dict[str, Any] = pickle.loads(cached[2])
+                return data
+
+            # The loader decodes bytes itself, so skip the intermediate str
+            async with aiofiles.open(full_path, "rb", executor=self._executor) as fh:
+                raw = await fh.read()
+
+            # Parsing a large document is CPU-bound; keep it off the event loop
+            data, pickled = await self._run_blocking(self._load_yaml_sync, raw)
+            self._yaml_cache[cache_key] = (stat.st_mtime_ns, stat.st_size, pickled)
+            if len(self._yaml_cache) > _YAML_CACHE_SIZE:
+                self._yaml_cache.popitem(last=False)
+            # The cache only holds the pickle, so the fresh parse can be returned as is
+            return data
         except yaml.YAMLError as exc:
             logger.error("YAML parse error in %s: %s", file_path, exc)
             raise YAMLParseError(f"Invalid YAML: {exc}") from exc
+        except (FileNotFoundError, PathSecurityError):
+            raise
+        except Exception as exc:
+            logger.error("Error reading file %s: %s", file_path, exc)
+            raise FileError(str(exc)) from exc
 
     async def preview_yaml_patch(
         self,
@@ -211,16 +335,24 @@ class AsyncFileManager:
     ) -> YAMLPatchPreview:
         """Preview semantic YAML patch operations without writing file changes."""
         content = await self.read_file(file_path)
-        return YAMLEditor.preview_patch(content, operations)
+        return await self._run_blocking(YAMLEditor.preview_patch, content, operations)
 
     async def apply_yaml_patch(
         self,
         file_path: str,
         operations: list[YAMLPatchOperation],
+        *,
+        include_diff: bool = True,
     ) -> YAMLPatchPreview:
-        """Apply semantic YAML patch operations and persist updated YAML content."""
+        """Apply semantic YAML patch operations and persist updated YAML content.
+
+        With ``include_diff=False`` the unified diff is not computed and the
+        result's ``diff`` is empty.
+        """
         content = await self.read_file(file_path)
-        preview = YAMLEditor.apply_patch(content, operations)
+        preview = await self._run_blocking(
+            YAMLEditor.apply_patch, content, operations, include_diff=include_diff
+        )
         if preview.success:
             await self.write_file(file_path, preview.patched_content)
         return preview
@@ -5,15 +5,78 @@ Ported from ``app/utils/yaml_editor.py`` in the HA Vibecode Agent add-on.
 
 from __future__ import annotations
 
-import copy
 import difflib
+import functools
+import hashlib
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from typing import Any
 
 import yaml
 
 from ..models.files import YAMLConflict, YAMLPatchOperation, YAMLPatchPreview
 
+# Prefer the LibYAML-backed loader and dumper; PyYAML builds without it fall back
+# to pure Python
+_SafeLoader: type[yaml.SafeLoader] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_SafeDumper: type[yaml.SafeDumper] = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Maximum number of parsed documents kept by ``_parse_cached``
+_PARSE_CACHE_SIZE = 128
+
+# content digest -> parsed data; entries are shared and must never be mutated
+_parse_cache: OrderedDict[bytes, Any] = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def _parse_cached(content: str) -> Any:
+    """Safely parse *content*, reusing earlier results for identical text.
+
+    Keyed by a digest rather than the text itself so large documents are not
+    kept alive by the cache. Parse errors propagate and are not cached.
+    """
+    digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+    with _parse_cache_lock:
+        if digest in _parse_cache:
+            _parse_cache.move_to_end(digest)
+            return _parse_cache[digest]
+
+    parsed = yaml.load(content, Loader=_SafeLoader)
+    with _parse_cache_lock:
+        _parse_cache[digest] = parsed
+        if len(_parse_cache) > _PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return parsed
+
+
+@functools.lru_cache(maxsize=256)
+def _empty_section_pattern(section_name: str) -> re.Pattern[str]:
+    """Compiled pattern for ``remove_empty_yaml_section``.
+
+    Matches an empty section with or without a preceding comment line that
+    names it, so a single scan handles both forms.
+    """
+    title = re.escape(section_name.title())
+    section = re.escape(section_name)
+    body = rf"{section}:\s*\n\s+\w+:\s*\n(?=\S|\Z)"
+    return re.compile(rf"\n(?:# .*{title}.*\n)?{body}", re.IGNORECASE)
+
+
+class _PatchState:
+    """Bookkeeping for one ``YAMLEditor._patch`` call."""
+
+    __slots__ = ("owned", "parent", "parent_path")
+
+    def __init__(self) -> None:
+        # id() -> every container copied for this patch; holding the objects
+        # keeps their ids from being reused
+        self.owned: dict[int, Any] = {}
+        # Parent container resolved by the last ``_ensure_parent`` walk
+        self.parent_path: list[str | int] | None = None
+        self.parent: Any = None
+
 
 class YAMLEditor:
     """Utility for editing YAML files while preserving structure."""
@@ -21,23 +84,20 @@ class YAMLEditor:
     @staticmethod
     def remove_lines_from_end(content: str, num_lines: int) -> str:
         """Remove *num_lines* from the end of *content*."""
-        lines = content.rstrip().split("\n")
-        if num_lines >= len(lines):
-            return ""
-        return "\n".join(lines[:-num_lines]) + "\n"
+        content = content.rstrip()
+        # Walk back over the last *num_lines* newlines instead of splitting it all
+        end = len(content)
+        for _ in range(num_lines):
+            end = content.rfind("\n", 0, end)
+            if end < 0:
+                return ""
+        return content[:end] + "\n"
 
     @staticmethod
     def remove_empty_yaml_section(content: str, section_name: str) -> str:
         """Remove an empty YAML section (e.g. ``lovelace:`` with only empty sub-keys)."""
-        # Pattern: comment + section with only empty subsections
-        pattern = rf"\n# .*{section_name.title()}.*\n{section_name}:\s*\n\s+\w+:\s*\n(?=\S|\Z)"
-        content = re.sub(pattern, "\n", content, flags=re.IGNORECASE)
-
-        # Also try without a preceding comment
-        pattern = rf"\n{section_name}:\s*\n\s+\w+:\s*\n(?=\S|\Z)"
-        content = re.sub(pattern, "\n", content, flags=re.IGNORECASE)
-
-        return content
+        # Section with only empty subsections, optionally preceded by a comment
+        return _empty_section_pattern(section_name).sub("\n", content)
 
     @staticmethod
     def remove_yaml_entry(
@@ -49,14 +109,36 @@ class YAMLEditor:
 
         Returns ``(modified_content, was_found)``.
         """
-        pattern = rf"    {re.escape(key)}:\s*\n(?:      .*\n)*"
+        # One pass over the lines: drop the ``    key:`` header, any blank lines
+        # directly under it and every following line indented six or more spaces
+        header = f"    {key}:"
+        # A substring check is far cheaper than splitting when the key is absent
+        if header not in content:
+            return content, False
+
+        lines = content.splitlines(keepends=True)
+        total = len(lines)
+        kept: list[str] = []
+        found = False
+        index = 0
+        while index < total:
+            line = lines[index]
+            index += 1
+            if line.rstrip() != header:
+                kept.append(line)
+                continue
+
+            found = True
+            while index < total and not lines[index].strip():
+                index += 1
+            while index < total and lines[index].startswith("      "):
+                index += 1
 
-        if re.search(pattern, content):
-            modified = re.sub(pattern, "", content)
-            modified = YAMLEditor.remove_empty_yaml_section(modified, section)
-            return modified, True
+        if not found:
+            return content, False
 
-        return content, False
+        modified = YAMLEditor.remove_empty_yaml_section("".join(kept), section)
+        return modified, True
 
     @staticmethod
     def _get_path(data: Any, path: list[str | int]) -> tuple[bool, Any]:
@@ -75,30 +157,52 @@ class YAMLEditor:
         return True, current
 
     @staticmethod
-    def _ensure_parent(data: Any, path: list[str | int]) -> tuple[bool, Any]:
+    def _writable_child(container: Any, key: str | int, state: _PatchState) -> Any:
+        """Return ``container[key]``, first swapping in a private shallow copy if needed."""
+        child = container[key]
+        if isinstance(child, (dict, list)) and id(child) not in state.owned:
+            child = child.copy()
+            container[key] = child
+            state.owned[id(child)] = child
+        return child
+
+    @staticmethod
+    def _ensure_parent(data: Any, path: list[str | int], state: _PatchState) -> tuple[bool, Any]:
+        prefix = path[:-1]
+        # Consecutive operations often target siblings; only writes to children
+        # of the parent happened since, so the previous walk is still valid
+        if prefix == state.parent_path:
+            return True, state.parent
+
         current = data
-        for segment in path[:-1]:
+        for segment in prefix:
             if isinstance(segment, int):
                 if not isinstance(current, list):
                     return False, None
                 if segment >= len(current):
                     return False, None
-                current = current[segment]
+                current = YAMLEditor._writable_child(current, segment, state)
             else:
                 if not isinstance(current, dict):
                     return False, None
                 if segment not in current or not isinstance(current[segment], (dict, list)):
-                    current[segment] = {}
-                current = current[segment]
-
+                    created: dict[str, Any] = {}
+                    current[segment] = created
+                    state.owned[id(created)] = created
+                    current = created
+                else:
+                    current = YAMLEditor._writable_child(current, segment, state)
+
+        state.parent_path = prefix
+        state.parent = current
         return True, current
 
     @staticmethod
-    def _set_path(data: Any, path: list[str | int], value: Any) -> bool:
+    def _set_path(data: Any, path: list[str | int], value: Any, state: _PatchState) -> bool:
         if not path:
             return False
 
-        ok, parent = YAMLEditor._ensure_parent(data, path)
+        ok, parent = YAMLEditor._ensure_parent(data, path, state)
         if not ok:
             return False
 
@@ -120,28 +224,32 @@ class YAMLEditor:
         return True
 
     @staticmethod
-    def _remove_path(data: Any, path: list[str | int]) -> bool:
+    def _remove_path(data: Any, path: list[str | int], state: _PatchState) -> bool:
         if not path:
             return False
 
-        ok, parent = YAMLEditor._ensure_parent(data, path)
-        if not ok:
-            return False
-
+        # Check on the shared tree first, so a remove that cannot apply neither
+        # copies the spine nor creates the missing parents
         leaf = path[-1]
+        found, parent = YAMLEditor._get_path(data, path[:-1])
         if isinstance(leaf, int):
-            if not isinstance(parent, list) or not (0 <= leaf < len(parent)):
+            if not (found and isinstance(parent, list) and 0 <= leaf < len(parent)):
                 return False
-            del parent[leaf]
-            return True
-
-        if not isinstance(parent, dict) or leaf not in parent:
+        elif not (found and isinstance(parent, dict) and leaf in parent):
             return False
+
+        _, parent = YAMLEditor._ensure_parent(data, path, state)
         del parent[leaf]
         return True
 
     @staticmethod
-    def _merge_list_item(data: Any, path: list[str | int], value: Any, merge_key: str) -> bool:
+    def _merge_list_item(
+        data: Any,
+        path: list[str | int],
+        value: Any,
+        merge_key: str,
+        state: _PatchState,
+    ) -> bool:
         ok, current = YAMLEditor._get_path(data, path)
         if not ok or not isinstance(current, list) or not isinstance(value, dict):
             return False
@@ -150,28 +258,61 @@ class YAMLEditor:
         if key_value is None:
             return False
 
+        # The path is known to exist, so copy along it only now that a write follows
+        current = data
+        for segment in path:
+            current = YAMLEditor._writable_child(current, segment, state)
+
+        # update() can replace whole subtrees, detaching a parent remembered by
+        # _ensure_parent, so the next operation must walk again
+        state.parent_path = None
         for index, item in enumerate(current):
             if isinstance(item, dict) and item.get(merge_key) == key_value:
-                current[index] = {**item, **value}
+                # Copies at most once per patch; later merges update in place
+                YAMLEditor._writable_child(current, index, state).update(value)
                 return True
 
         current.append(value)
         return True
 
+    @staticmethod
+    def _apply_set(data: Any, operation: YAMLPatchOperation, state: _PatchState) -> bool:
+        return YAMLEditor._set_path(data, operation.path, operation.value, state)
+
+    @staticmethod
+    def _apply_remove(data: Any, operation: YAMLPatchOperation, state: _PatchState) -> bool:
+        return YAMLEditor._remove_path(data, operation.path, state)
+
+    @staticmethod
+    def _apply_merge_item(data: Any, operation: YAMLPatchOperation, state: _PatchState) -> bool:
+        if not operation.merge_key:
+            return False
+        return YAMLEditor._merge_list_item(
+            data, operation.path, operation.value, operation.merge_key, state
+        )
+
+    @staticmethod
+    def normalized_diff_lines(before: str, after: str) -> Iterator[str]:
+        """Yield the lines of :meth:`normalized_diff` lazily, without line terminators."""
+        # ``rstrip`` returns the string itself when there is nothing to strip
+        before = before.rstrip()
+        after = after.rstrip()
+        # Identical text has an empty diff; skip splitting and SequenceMatcher
+        if before == after:
+            return iter(())
+
+        return difflib.unified_diff(
+            before.splitlines(),
+            after.splitlines(),
+            fromfile="before.yaml",
+            tofile="after.yaml",
+            lineterm="",
+        )
+
     @staticmethod
     def normalized_diff(before: str, after: str) -> str:
         """Return deterministic unified diff output for content comparisons."""
-        before_lines = before.rstrip().splitlines()
-        after_lines = after.rstrip().splitlines()
-        return "\n".join(
-            difflib.unified_diff(
-                before_lines,
-                after_lines,
-                fromfile="before.yaml",
-                tofile="after.yaml",
-                lineterm="",
-            )
-        )
+        return "\n".join(YAMLEditor.normalized_diff_lines(before, after))
 
     @staticmethod
     def preview_patch(
@@ -179,8 +320,33 @@ class YAMLEditor:
         operations: list[YAMLPatchOperation],
     ) -> YAMLPatchPreview:
         """Preview semantic YAML mutations and report conflicts before apply."""
+        return YAMLEditor._patch(content, operations, include_diff=True)
+
+    @staticmethod
+    def apply_patch(
+        content: str,
+        operations: list[YAMLPatchOperation],
+        *,
+        include_diff: bool = True,
+    ) -> YAMLPatchPreview:
+        """Apply semantic YAML mutations, returning final content and diff metadata.
+
+        Shares the parse cache with :meth:`preview_patch`, so applying a patch
+        that was just previewed does not parse the document again. Pass
+        ``include_diff=False`` when only the patched content is needed; the
+        result's ``diff`` is then empty.
+        """
+        return YAMLEditor._patch(content, operations, include_diff=include_diff)
+
+    @staticmethod
+    def _patch(
+        content: str,
+        operations: list[YAMLPatchOperation],
+        *,
+        include_diff: bool,
+    ) -> YAMLPatchPreview:
         try:
-            parsed = yaml.safe_load(content) if content.strip() else {}
+            parsed = _parse_cached(content) if content.strip() else {}
         except yaml.YAMLError as exc:
             return YAMLPatchPreview(
                 success=False,
@@ -190,27 +356,20 @@ class YAMLEditor:
                 diff="",
             )
 
-        data = parsed or {}
-        mutated = copy.deepcopy(data)
+        # The parsed tree is shared through the cache and must stay pristine.
+        # Rather than deep-copying it, containers are shallow-copied on the way
+        # down to each write, so untouched subtrees stay shared.
+        mutated = parsed or {}
+        state = _PatchState()
+        if isinstance(mutated, (dict, list)):
+            mutated = mutated.copy()
+            state.owned[id(mutated)] = mutated
         conflicts: list[YAMLConflict] = []
         applied = 0
 
         for operation in operations:
-            if operation.op == "set":
-                ok = YAMLEditor._set_path(mutated, operation.path, operation.value)
-            elif operation.op == "remove":
-                ok = YAMLEditor._remove_path(mutated, operation.path)
-            elif not operation.merge_key:
-                ok = False
-            else:
-                ok = YAMLEditor._merge_list_item(
-                    mutated,
-                    operation.path,
-                    operation.value,
-                    operation.merge_key,
-                )
-
-            if ok:
+            handler = _OPERATION_HANDLERS.get(operation.op)
+            if handler is not None and handler(mutated, operation, state):
                 applied += 1
             else:
                 conflicts.append(
@@ -220,16 +379,21 @@ class YAMLEditor:
                     )
                 )
 
-        patched_content = yaml.safe_dump(mutated, sort_keys=True, allow_unicode=True)
+        patched_content = yaml.dump(
+            mutated, Dumper=_SafeDumper, sort_keys=True, allow_unicode=True
+        )
         return YAMLPatchPreview(
             success=not conflicts,
             operations_applied=applied,
             conflicts=conflicts,
             patched_content=patched_content,
-            diff=YAMLEditor.normalized_diff(content, patched_content),
+            diff=YAMLEditor.normalized_diff(content, patched_content) if include_diff else "",
         )
 
-    @staticmethod
-    def apply_patch(content: str, operations: list[YAMLPatchOperation]) -> YAMLPatchPreview:
-        """Apply semantic YAML mutations, returning final content and diff metadata."""
-        return YAMLEditor.preview_patch(content, operations)
+
+# ``YAMLPatchOperation.op`` -> handler, resolved once per operation in ``_patch``
+_OPERATION_HANDLERS: dict[str, Callable[[Any, YAMLPatchOperation, _PatchState], bool]] = {
+    "set": YAMLEditor._apply_set,
+    "remove": YAMLEditor._apply_remove,
+    "merge_item": YAMLEditor._apply_merge_item,
+}
@@ -1,18 +1,19 @@
 """History truncation for the shadow git repository.
 
-Uses dulwich for commit-chain rewriting where possible.  Falls back to
-``git clone --depth`` via subprocess if the ``git`` binary is available.
+Shallows the repository in place with ``git fetch --depth`` when the ``git``
+binary is available, otherwise rewrites the commit chain with dulwich.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import os
-import shutil
 import subprocess
-import tempfile
+from functools import cache
 from pathlib import Path
 
+from dulwich import porcelain
+from dulwich.objects import Commit
 from dulwich.repo import Repo
 
 from ..exceptions import GitError
@@ -20,8 +21,9 @@ from ..exceptions import GitError
 logger = logging.getLogger(__name__)
 
 
+@cache
 def _git_binary_available() -> bool:
-    """Return ``True`` if the ``git`` CLI is on ``$PATH``."""
+    """Return ``True`` if the ``git`` CLI is on ``$PATH`` (probed once per process)."""
     try:
         result = subprocess.run(
             ["git", "--version"],
@@ -43,11 +45,11 @@ def truncate_history(
 
     The strategy is:
 
-    1. If the ``git`` binary is available, use ``git clone --depth`` into a
-       temp dir, then swap ``.git`` directories.  This is the most reliable
-       approach on HA OS (where git is available in the container).
-    2. Otherwise raise :class:`GitError` — pure-dulwich history rewriting is
-       a future enhancement.
+    1. If the ``git`` binary is available, run ``git fetch --depth`` against
+       the repository itself, then expire reflogs and ``gc``.  This is the
+       most reliable approach on HA OS (where git is available in the
+       container) and needs no temporary copy of the object store.
+    2. Otherwise fall back to a basic dulwich-native orphan graft.
     """
     repo_path = repo_path.resolve()
     git_dir = repo_path / ".git"
@@ -55,18 +57,28 @@ def truncate_history(
     if not git_dir.is_dir():
         raise GitError(f"No .git directory at {repo_path}")
 
-    # --- Strategy 1: git clone --depth ---
+    # --- Strategy 1: git fetch --depth (in place) ---
     if _git_binary_available():
-        return _truncate_via_clone(repo_path, commits_to_keep)
+        return _truncate_via_shallow_fetch(repo_path, commits_to_keep)
 
     # --- Strategy 2: dulwich-native (basic orphan graft) ---
     return _truncate_via_dulwich(repo_path, commits_to_keep)
 
 
-def _truncate_via_clone(repo_path: Path, commits_to_keep: int) -> int:
-    """Clone with ``--depth`` and swap ``.git`` directories."""
-    git_dir = repo_path / ".git"
+async def async_truncate_history(
+    repo_path: Path,
+    commits_to_keep: int,
+) -> int:
+    """Asynchronously truncate the repository at *repo_path*.
+
+    Runs :func:`truncate_history` in a worker thread so its ``git``
+    subprocesses never block the event loop.
+    """
+    return await asyncio.to_thread(truncate_history, repo_path, commits_to_keep)
 
+
+def _truncate_via_shallow_fetch(repo_path: Path, commits_to_keep: int) -> int:
+    """Make the repository shallow in place with ``git fetch --depth``."""
     # Detect current branch
     try:
         result = subprocess.run(
@@ -80,44 +92,55 @@ def _truncate_via_clone(repo_path: Path, commits_to_keep: int) -> int:
     except Exception:
         branch = "master"
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        clone_path = os.path.join(tmpdir, "cloned_repo")
-        repo_url = f"file://{repo_path}"
-
-        logger.info("Cloning repository with depth=%d from %s ...", commits_to_keep, repo_url)
+    logger.info("Shallowing repository to depth=%d in place ...", commits_to_keep)
+    result = subprocess.run(
+        [
+            "git",
+            "fetch",
+            "--update-head-ok",
+            "--no-tags",
+            "--depth",
+            str(commits_to_keep),
+            ".",
+            f"{branch}:{branch}",
+        ],
+        cwd=str(repo_path),
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    if result.returncode != 0:
+        raise GitError(f"git fetch failed: {result.stderr}")
+
+    # Drop tags (e.g. old checkpoints) that now point past the shallow boundary,
+    # otherwise they keep the truncated history alive through gc.
+    try:
         result = subprocess.run(
-            [
-                "git",
-                "clone",
-                "--depth",
-                str(commits_to_keep),
-                "--branch",
-                branch,
-                "--single-branch",
-                repo_url,
-                clone_path,
-            ],
+            ["git", "tag", "--no-merged", "HEAD"],
+            cwd=str(repo_path),
             capture_output=True,
             text=True,
-            timeout=600,
+            timeout=10,
         )
-        if result.returncode != 0:
-            raise GitError(f"git clone failed: {result.stderr}")
-
-        cloned_git_dir = os.path.join(clone_path, ".git")
-        if not os.path.isdir(cloned_git_dir):
-            raise GitError("Cloned .git directory does not exist")
-
-        # Swap .git
-        backup_git = os.path.join(tmpdir, "git_backup")
-        shutil.copytree(str(git_dir), backup_git)
-        shutil.rmtree(str(git_dir))
-        shutil.copytree(cloned_git_dir, str(git_dir))
-
-        logger.info("Replaced .git directory with shallow clone")
+        stale_tags = result.stdout.split()
+        if stale_tags:
+            subprocess.run(
+                ["git", "tag", "-d", *stale_tags],
+                cwd=str(repo_path),
+                capture_output=True,
+                timeout=10,
+            )
+    except Exception as exc:
+        logger.warning("Pruning stale tags after truncation failed: %s", exc)
 
-    # Optional gc
+    # Optional reflog expiry + gc
     try:
+        subprocess.run(
+            ["git", "reflog", "expire", "--expire=now", "--all"],
+            cwd=str(repo_path),
+            capture_output=True,
+            timeout=60,
+        )
         subprocess.run(
             ["git", "gc", "--prune=now", "--quiet"],
             cwd=str(repo_path),
@@ -146,7 +169,7 @@ def _truncate_via_dulwich(repo_path: Path, commits_to_keep: int) -> int:
 
     Walks the commit chain, keeps *commits_to_keep* most recent commits,
     and rewrites the oldest-kept commit to have no parents (orphan root).
-    Then packs and prunes unreachable objects.
+    Then packs the loose objects; unreachable ones are not pruned.
     """
     repo = Repo(str(repo_path))
 
@@ -155,12 +178,12 @@ def _truncate_via_dulwich(repo_path: Path, commits_to_keep: int) -> int:
     except KeyError:
         raise GitError("Repository has no HEAD") from None
 
-    # Walk the first-parent chain
-    chain: list[bytes] = []
+    # Walk the first-parent chain once, keeping the commit objects for the rewrite
+    chain: list[Commit] = []
     current = head_sha
     while current and len(chain) < commits_to_keep + 1:
-        chain.append(current)
         commit = repo.get_object(current)
+        chain.append(commit)
         current = commit.parents[0] if commit.parents else None
 
     if len(chain) <= commits_to_keep:
@@ -168,33 +191,36 @@ def _truncate_via_dulwich(repo_path: Path, commits_to_keep: int) -> int:
         return len(chain)
 
     # Rewrite the oldest kept commit to have no parents
-    oldest_kept_sha = chain[commits_to_keep - 1]
-    oldest_kept = repo.get_object(oldest_kept_sha).copy()
+    oldest_kept = chain[commits_to_keep - 1].copy()
     oldest_kept.parents = []
 
     # Store the rewritten commit
     repo.object_store.add_object(oldest_kept)
 
     # Rewrite the chain from oldest-kept to HEAD
-    sha_map: dict[bytes, bytes] = {oldest_kept_sha: oldest_kept.id}
+    sha_map: dict[bytes, bytes] = {chain[commits_to_keep - 1].id: oldest_kept.id}
 
-    for i in range(commits_to_keep - 2, -1, -1):
-        old_sha = chain[i]
-        commit = repo.get_object(old_sha).copy()
+    for original in reversed(chain[: commits_to_keep - 1]):
+        commit = original.copy()
         # Replace parent references
-        new_parents = []
-        for p in commit.parents:
-            new_parents.append(sha_map.get(p, p))
-        commit.parents = new_parents
+        commit.parents = [sha_map.get(p, p) for p in original.parents]
         repo.object_store.add_object(commit)
-        sha_map[old_sha] = commit.id
+        sha_map[original.id] = commit.id
 
-    # Update HEAD/refs to point to new chain
+    # Update HEAD/refs to point to new chain (refs snapshotted once)
     new_head = sha_map.get(head_sha, head_sha)
-    for ref in repo.get_refs():
-        if repo.get_refs()[ref] == head_sha:
+    for ref, sha in repo.get_refs().items():
+        if sha == head_sha:
             repo.refs[ref] = new_head
 
+    # Fold the loose objects (including the rewritten commits) into one pack,
+    # the counterpart of the git strategy's gc, so later lookups hit a pack
+    # index instead of one file per object
+    try:
+        porcelain.repack(repo)
+    except Exception as exc:
+        logger.warning("Repack after truncation failed: %s", exc)
+
     repo.close()
 
     return commits_to_keep
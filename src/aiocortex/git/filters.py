@@ -8,6 +8,8 @@ from __future__ import annotations
 
 import fnmatch
 import os
+import re
+from functools import lru_cache
 
 # Directories excluded at the top level of /config
 _EXCLUDED_DIRS: frozenset[str] = frozenset(
@@ -48,12 +50,58 @@ _DIR_PREFIXES: tuple[str, ...] = (
     "tmp/",
 )
 
+# Every prefix above is a single top-level directory, so a file check reduces
+# to set membership on the first path segment, shared with directory pruning.
+_EXCLUDED_TOP_DIRS: frozenset[str] = _EXCLUDED_DIRS | frozenset(
+    prefix.rstrip("/") for prefix in _DIR_PREFIXES
+)
+
+
+_DEFAULT_SHADOW_DIR_NAME = "cortex_git"
+
+# Only Windows-style separators need rewriting; on POSIX this is a no-op
+_NEEDS_SEP_NORM = os.sep != "/"
+
+
+@lru_cache(maxsize=8)
+def _skipped_top_dirs(shadow_dir_name: str) -> frozenset[str]:
+    """Return the top-level names never tracked: ``.git`` and the shadow repo."""
+    return frozenset({".git", shadow_dir_name})
+
+
+_DEFAULT_SKIPPED_TOP_DIRS = _skipped_top_dirs(_DEFAULT_SHADOW_DIR_NAME)
+
+
+def _is_suffix_glob(pattern: str) -> bool:
+    """Return ``True`` for globs of the form ``*<literal suffix>``."""
+    return pattern.startswith("*") and not any(ch in pattern[1:] for ch in "*?[")
+
+
+def _compile_globs(patterns: tuple[str, ...]) -> re.Pattern[str]:
+    """Combine *patterns* into a single compiled regex alternation."""
+    return re.compile("|".join(fnmatch.translate(pat) for pat in patterns))
+
+
+_EXCLUDED_GLOBS: tuple[str, ...] = (
+    *_SECRET_EXTS,
+    *_DB_PATTERNS,
+    *_LOG_PATTERNS,
+    *_BACKUP_PATTERNS,
+)
+
+# Pure ``*.ext`` globs collapse into one C-level ``str.endswith`` test; only
+# the remaining globs (``*.log.*``, ``home-assistant_v2.db*``) need a regex.
+_SUFFIX_EXCLUDES: tuple[str, ...] = tuple(
+    pat[1:] for pat in _EXCLUDED_GLOBS if _is_suffix_glob(pat)
+)
+_RESIDUAL_RE = _compile_globs(tuple(pat for pat in _EXCLUDED_GLOBS if not _is_suffix_glob(pat)))
+
 
 def should_include_path(
     rel_path: str,
     is_dir: bool,
     *,
-    shadow_dir_name: str = "cortex_git",
+    shadow_dir_name: str = _DEFAULT_SHADOW_DIR_NAME,
 ) -> bool:
     """Return ``True`` if *rel_path* (relative to ``/config``) should be tracked.
 
@@ -66,46 +114,36 @@ def should_include_path(
     shadow_dir_name:
         Name of the shadow-repo directory to exclude (default ``cortex_git``).
     """
-    rel_path = rel_path.replace(os.sep, "/")
+    if _NEEDS_SEP_NORM:
+        rel_path = rel_path.replace(os.sep, "/")
     parts = rel_path.split("/")
 
+    top = parts[0]
+
     # Skip shadow repo and any .git directories
-    if parts[0] in (".git", shadow_dir_name):
+    skipped = (
+        _DEFAULT_SKIPPED_TOP_DIRS
+        if shadow_dir_name == _DEFAULT_SHADOW_DIR_NAME
+        else _skipped_top_dirs(shadow_dir_name)
+    )
+    if top in skipped:
+        return False
+
+    # Excluded top-level directories and any files beneath them
+    if top in _EXCLUDED_TOP_DIRS and (is_dir or len(parts) > 1):
         return False
 
-    # Directory-level filtering
     if is_dir:
-        return parts[0] not in _EXCLUDED_DIRS
+        return True
 
     filename = parts[-1]
 
-    # Secrets / keys
+    # Secrets, keys, DB files, logs and backup-like files — cheapest first
     if filename in _SECRET_FILES:
         return False
-    if any(fnmatch.fnmatch(filename, pat) for pat in _SECRET_EXTS):
+    if filename.endswith(_SUFFIX_EXCLUDES):
         return False
-
-    # DB files
-    if any(
-        fnmatch.fnmatch(filename, pat) or fnmatch.fnmatch(rel_path, pat) for pat in _DB_PATTERNS
-    ):
-        return False
-
-    # Logs
-    if any(
-        fnmatch.fnmatch(filename, pat) or fnmatch.fnmatch(rel_path, pat) for pat in _LOG_PATTERNS
-    ):
-        return False
-
-    # Backup-like files
-    if any(
-        fnmatch.fnmatch(filename, pat) or fnmatch.fnmatch(rel_path, pat)
-        for pat in _BACKUP_PATTERNS
-    ):
-        return False
-
-    # Files inside heavy/internal dirs (if they weren't pruned at dir level)
-    if any(rel_path.startswith(prefix) for prefix in _DIR_PREFIXES):
+    if _RESIDUAL_RE.match(filename) or _RESIDUAL_RE.match(rel_path):
         return False
 
     return True
@@ -3,22 +3,35 @@
 Ported from ``app/services/git_manager.py`` in the HA Vibecode Agent add-on.
 All GitPython / subprocess calls have been replaced with dulwich equivalents.
 
-All public async methods delegate to synchronous helpers via
-``asyncio.to_thread`` so that dulwich I/O never blocks the event loop.
+All public async methods delegate to synchronous helpers run on a small,
+dedicated git executor so that dulwich I/O never blocks the event loop.
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
+import codecs
+import fnmatch
+import functools
+import io
 import logging
+import os
+import re
 import shutil
+import stat
+import time
 import uuid
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Protocol
 
 from dulwich import porcelain
+from dulwich.index import get_unstaged_changes
+from dulwich.object_store import BaseObjectStore, iter_tree_contents
+from dulwich.objects import S_ISGITLINK, ObjectID, Tree, TreeEntry
+from dulwich.patch import write_tree_diff
 from dulwich.repo import Repo
 
 from ..exceptions import GitError, GitNotInitializedError
@@ -38,12 +51,158 @@ from ..models.git import (
     TransactionValidationResult,
 )
 from .cleanup import truncate_history
-from .sync import sync_config_to_shadow, sync_shadow_to_config
+from .sync import (
+    RACY_WINDOW_NS,
+    config_tree_signature,
+    sync_config_to_shadow,
+    sync_shadow_to_config,
+)
 
 logger = logging.getLogger(__name__)
 
 _AUTHOR = b"Cortex <cortex@homeassistant.local>"
 
+# Shared by every GitManager that isn't given its own executor.  Kept small:
+# dulwich work is I/O-bound and concurrent writers to one repo only contend.
+_SHARED_GIT_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="aiocortex-git")
+
+# stream_diff: bytes buffered per hand-off, and hand-offs queued ahead of the consumer
+_DIFF_CHUNK_SIZE = 64 * 1024
+_DIFF_QUEUE_SIZE = 8
+
+# (config tree signature, HEAD sha) identifying a pending-changes scan
+_PendingKey = tuple[tuple[int, int], bytes | None]
+
+
+# Upper bound on threads used to back up and apply a transaction's files
+_TRANSACTION_IO_WORKERS = 8
+
+
+def _run_parallel(func: Callable[[Any, Any], object], items: Iterable[tuple[Any, Any]]) -> None:
+    """Call ``func(a, b)`` for each pair in *items* on a short-lived thread pool.
+
+    The first exception raised by any call propagates once all calls finished.
+    """
+    pairs = list(items)
+    if len(pairs) <= 1:
+        for a, b in pairs:
+            func(a, b)
+        return
+    with ThreadPoolExecutor(max_workers=min(_TRANSACTION_IO_WORKERS, len(pairs))) as pool:
+        for future in [pool.submit(func, a, b) for a, b in pairs]:
+            future.result()
+
+
+# A restore walk remembers blobs up to this size, within a total byte budget;
+# repeats are mostly small (empty files, snippets) and most blobs are unique
+_RESTORE_BLOB_CACHE_ITEM_BYTES = 4 * 1024
+_RESTORE_BLOB_CACHE_BYTES = 1024 * 1024
+
+# Staged writes larger than this (in characters) are stored in a side file
+# rather than inline in the transaction JSON, which is re-read on every call
+_INLINE_CONTENT_LIMIT = 4096
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_blob(path: str, data: bytes) -> None:
+    """Write *data* to *path* with raw ``os`` calls, bypassing pathlib and file objects."""
+    fd = os.open(path, _WRITE_FLAGS, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _fs_path(path: str | bytes) -> str:
+    """Decode a status path losslessly, so it can be handed back to staging."""
+    return path.decode("utf-8", errors="surrogateescape") if isinstance(path, bytes) else path
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Return the part of fnmatch *pattern* before its first wildcard.
+
+    fnmatch's ``*`` also matches ``/``, so only this leading text is fixed.
+    """
+    cut = min((i for i in map(pattern.find, "*?[") if i >= 0), default=len(pattern))
+    return pattern[:cut]
+
+
+def _iter_tree_files(
+    store: BaseObjectStore,
+    tree_id: ObjectID,
+    keep_dir: Callable[[bytes], bool] | None = None,
+) -> Iterator[TreeEntry]:
+    """Yield non-tree entries under *tree_id* in ``iter_tree_contents`` order.
+
+    Subtrees whose path (with a trailing ``/``) fails *keep_dir* are not read.
+    """
+    if keep_dir is None:
+        yield from iter_tree_contents(store, tree_id)
+        return
+    todo = [TreeEntry(b"", stat.S_IFDIR, tree_id)]
+    while todo:
+        entry = todo.pop()
+        if not stat.S_ISDIR(entry.mode):
+            yield entry
+            continue
+        tree = store[entry.sha]
+        assert isinstance(tree, Tree)
+        children = [sub.in_path(entry.path) for sub in tree.iteritems(name_order=True)]
+        todo.extend(
+            reversed([c for c in children if not stat.S_ISDIR(c.mode) or keep_dir(c.path + b"/")])
+        )
+
+
+class _BytesSink(Protocol):
+    def write(self, data: bytes, /) -> int: ...
+
+    def writelines(self, lines: Iterable[bytes], /) -> None: ...
+
+
+class _DiffChunkWriter:
+    """File-like sink that hands diff bytes from a worker thread to an asyncio queue.
+
+    Writes are coalesced into ``_DIFF_CHUNK_SIZE`` chunks so the many small
+    per-line writes of ``write_tree_diff`` cost one cross-thread hand-off per
+    chunk.  The bounded queue makes the producer wait for a slow consumer.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue[bytes | None]
+    ) -> None:
+        self._loop = loop
+        self._queue = queue
+        self._buf = bytearray()
+        self.cancelled = False
+
+    def _put(self, item: bytes | None) -> None:
+        asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop).result()
+
+    def write(self, data: bytes, /) -> int:
+        if self.cancelled:
+            raise GitError("Diff stream closed by consumer")
+        self._buf += data
+        if len(self._buf) >= _DIFF_CHUNK_SIZE:
+            self._put(bytes(self._buf))
+            self._buf.clear()
+        return len(data)
+
+    def writelines(self, lines: Iterable[bytes], /) -> None:
+        for line in lines:
+            self.write(line)
+
+    def finish(self) -> None:
+        """Flush buffered bytes and signal end of stream."""
+        if self.cancelled:
+            return
+        if self._buf:
+            self._put(bytes(self._buf))
+            self._buf.clear()
+        self._put(None)
+
 
 class GitManager:
     """Manages a shadow git repository for HA config versioning.
@@ -59,8 +218,12 @@ class GitManager:
         max_backups: int = 30,
         auto_commit: bool = True,
         shadow_dir_name: str = "cortex_git",
+        executor: Executor | None = None,
     ) -> None:
         self.config_path = config_path.resolve()
+        self._config_str = str(self.config_path)
+        # Trailing separator so ``/configXYZ`` is not mistaken for a child path
+        self._config_prefix = os.path.join(self._config_str, "")
         self.shadow_root = self.config_path / shadow_dir_name
         self.shadow_dir_name = shadow_dir_name
         self.max_backups = max_backups
@@ -68,14 +231,42 @@ class GitManager:
         self.processing_request = False
         self.transaction_dir = self.shadow_root / ".cortex_transactions"
 
+        self._executor = executor or _SHARED_GIT_EXECUTOR
+        # The executor may run several jobs at once, but one Repo, its index
+        # and the caches below must only be touched by one job at a time
+        self._git_lock = asyncio.Lock()
+        # Tasks consuming an open stream_diff, whose producer holds _git_lock
+        self._stream_consumers: set[asyncio.Task[Any]] = set()
         self._repo: Repo | None = None
+        # (HEAD sha, first-parent commit count) — avoids re-walking history per commit
+        self._commit_count_cache: tuple[bytes, int] | None = None
+        # Config signature at the last sync that left the shadow tree clean
+        self._clean_signature: tuple[int, int] | None = None
+        # ((config signature, HEAD), result) of the last pending-changes scan that
+        # found changes; reused while neither the config nor HEAD has moved
+        self._pending_cache: tuple[_PendingKey, dict[str, Any]] | None = None
+
+    async def _run_blocking[T](self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run *func* on this manager's git executor, one job per manager at a time."""
+        if asyncio.current_task() in self._stream_consumers:
+            # Waiting for the lock here would deadlock against our own stream
+            raise GitError("stream_diff is still open in this task; drain or close it first")
+        loop = asyncio.get_running_loop()
+        async with self._git_lock:
+            future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The worker cannot be interrupted: hold the lock until it finishes
+                await asyncio.wait({future})
+                raise
 
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
     def _init_repo_sync(self) -> None:
-        """Synchronous init — called via ``asyncio.to_thread``."""
+        """Synchronous init — run on the git executor."""
         self.shadow_root.mkdir(parents=True, exist_ok=True)
         self.transaction_dir.mkdir(parents=True, exist_ok=True)
         if (self.shadow_root / ".git").exists():
@@ -93,7 +284,7 @@ class GitManager:
     async def init_repo(self) -> None:
         """Initialise (or load) the shadow repository."""
         try:
-            await asyncio.to_thread(self._init_repo_sync)
+            await self._run_blocking(self._init_repo_sync)
         except Exception as exc:
             logger.error("Failed to initialise git: %s", exc)
 
@@ -111,60 +302,143 @@ class GitManager:
     def _backup_dir(self, transaction_id: str) -> Path:
         return self.transaction_dir / "backups" / transaction_id
 
+    def _blob_dir(self, transaction_id: str) -> Path:
+        return self.transaction_dir / "blobs" / transaction_id
+
     def _resolve_config_path(self, relative_path: str) -> Path:
-        candidate = (self.config_path / relative_path.lstrip("/")).resolve()
-        if not str(candidate).startswith(str(self.config_path)):
+        # String-level realpath: symlinks are still followed for containment,
+        # without building intermediate Path objects per call
+        candidate = os.path.realpath(os.path.join(self._config_str, relative_path.lstrip("/")))
+        if candidate != self._config_str and not candidate.startswith(self._config_prefix):
             raise GitError(f"Path outside config directory: {relative_path}")
-        return candidate
+        return Path(candidate)
 
     def _load_transaction_sync(self, transaction_id: str) -> TransactionState:
         tx_file = self._transaction_file(transaction_id)
         if not tx_file.exists():
             raise GitError(f"Transaction not found: {transaction_id}")
-        data = json.loads(tx_file.read_text(encoding="utf-8"))
-        return TransactionState.model_validate(data)
+        # Parse and validate in one pass in pydantic-core, with no intermediate dict
+        return TransactionState.model_validate_json(tx_file.read_bytes())
 
     def _save_transaction_sync(self, transaction: TransactionState) -> None:
         self.transaction_dir.mkdir(parents=True, exist_ok=True)
         tx_file = self._transaction_file(transaction.transaction_id)
-        tx_file.write_text(
-            json.dumps(transaction.model_dump(mode="json"), indent=2),
-            encoding="utf-8",
-        )
+        tx_file.write_bytes(transaction.model_dump_json(indent=2).encode())
 
     # ------------------------------------------------------------------
     # Status helpers
     # ------------------------------------------------------------------
 
-    def _is_dirty(self) -> bool:
-        """Return ``True`` if there are uncommitted changes in the shadow repo."""
-        status = porcelain.status(str(self.shadow_root))
-        staged = status.staged
-        unstaged = status.unstaged
-        untracked = status.untracked
-        return bool(
-            staged.get("add")
-            or staged.get("delete")
-            or staged.get("modify")
-            or unstaged
-            or untracked
+    def _check_config_signature(self) -> tuple[bool, tuple[int, int] | None]:
+        """Compare the config tree against the last clean sync.
+
+        Returns ``(unchanged, signature)``.  When *unchanged* is ``False`` the
+        stored clean signature is dropped and *signature* is the value to
+        record once the shadow tree is found clean again — or ``None`` if
+        recent modifications make it untrustworthy.
+        """
+        scan_started = time.time_ns()
+        signature = config_tree_signature(self.config_path, shadow_dir_name=self.shadow_dir_name)
+        if signature == self._clean_signature:
+            return True, signature
+        self._clean_signature = None
+        if signature[1] > scan_started - RACY_WINDOW_NS:
+            return False, None
+        return False, signature
+
+    def _dirty_state(self) -> tuple[bool, list[str]]:
+        """Return ``(dirty, paths to stage)`` for the shadow worktree.
+
+        *paths to stage* are the unstaged and untracked files, relative to the
+        shadow root; already-staged changes count as dirty but need no restaging.
+        """
+        # The worktree scans of porcelain.status, without its index-vs-HEAD
+        # comparison: that only matters when the worktree itself is clean
+        repo = self.repo
+        index = repo.open_index()
+        normalizer = repo.get_blob_normalizer()
+        to_stage = [
+            _fs_path(p)
+            for p in get_unstaged_changes(
+                index, repo.path, normalizer.checkin_normalize if normalizer is not None else None
+            )
+        ]
+        to_stage.extend(
+            porcelain.get_untracked_paths(
+                repo.path, repo.path, index, exclude_ignored=True, untracked_files="all"
+            )
         )
+        if to_stage:
+            return True, to_stage
+
+        try:
+            head_tree: ObjectID | None = repo[repo.head()].tree
+        except KeyError:
+            head_tree = None
+        # Stop at the first staged change instead of classifying them all
+        changes = index.changes_from_tree(repo.object_store, head_tree)
+        return next(iter(changes), None) is not None, []
+
+    def _commit_count(self, limit: int | None = None) -> int:
+        """Count first-parent commits reachable from HEAD (memoized per HEAD).
 
-    def _commit_count(self) -> int:
-        """Count first-parent commits reachable from HEAD."""
+        With *limit*, the walk stops once *limit* commits have been seen, so
+        threshold checks cost at most *limit* object reads; such partial
+        counts are not memoized.
+        """
         try:
             head = self.repo.head()
         except KeyError:
             return 0
 
+        cached = self._commit_count_cache
+        if cached is not None and cached[0] == head:
+            return cached[1]
+
+        get_object = self.repo.get_object
+        # After a shallow truncation the boundary commits' parents are absent;
+        # Repo.get_shallow is available in every dulwich the floor allows
+        shallow = self.repo.get_shallow()
         count = 0
         current: bytes | None = head
         while current:
             count += 1
-            commit = self.repo.get_object(current)
+            if limit is not None and count >= limit:
+                return count
+            if current in shallow:
+                break
+            commit = get_object(current)
             current = commit.parents[0] if commit.parents else None
+        self._commit_count_cache = (head, count)
         return count
 
+    def _reload_after_truncation(self, commits_after: int) -> None:
+        """Reopen the repo after :func:`truncate_history` and seed the count memo."""
+        self._repo = Repo(str(self.shadow_root))
+        self._commit_count_cache = (self._repo.head(), commits_after)
+
+    def _resolve_commit_sha(self, commit_hash: str) -> bytes:
+        """Expand an abbreviated *commit_hash* to a full commit SHA.
+
+        Uses the object store's prefix lookup (one loose-object directory
+        listing plus a pack-index bisect) rather than scanning every object.
+        Unresolvable input is returned as-is so the caller's lookup fails.
+        """
+        commit_sha = commit_hash.encode("ascii", errors="replace")
+        if len(commit_sha) >= 40:
+            return commit_sha
+
+        store = self.repo.object_store
+        # iter_prefix needs dulwich >= 0.22.8; the pyproject floor covers it
+        try:
+            for sha in store.iter_prefix(commit_sha.lower()):
+                if store[sha].type_name == b"commit":
+                    return sha
+        except ValueError:
+            # Not a hex prefix
+            pass
+        return commit_sha
+
     # ------------------------------------------------------------------
     # Core: commit
     # ------------------------------------------------------------------
@@ -175,38 +449,64 @@ class GitManager:
         *,
         force: bool = False,
     ) -> str | None:
-        """Synchronous commit — called via ``asyncio.to_thread``."""
+        """Synchronous commit — run on the git executor."""
+        # Fast path: nothing trackable changed since the shadow tree was last clean
+        unchanged, signature = self._check_config_signature()
+        if unchanged:
+            logger.debug("No changes to commit")
+            return None
+
         sync_config_to_shadow(
             self.config_path,
             self.shadow_root,
             shadow_dir_name=self.shadow_dir_name,
         )
 
-        if not self._is_dirty():
+        dirty, to_stage = self._dirty_state()
+        if not dirty:
             logger.debug("No changes to commit")
+            self._clean_signature = signature
             return None
 
         if not self.auto_commit and not force:
             logger.debug("Auto-commit disabled, changes synced but not committed")
             return None
 
-        # Stage all changes
-        porcelain.add(str(self.shadow_root), paths=None)  # stages everything
+        # Stage only what status already found changed, instead of rescanning
+        # the whole worktree, then commit through the same worktree handle
+        # rather than porcelain (which reopens the repo and re-reads config).
+        worktree = self.repo.get_worktree()
+        if to_stage:
+            worktree.stage(to_stage)
 
         if not message:
             message = f"Auto-commit by Cortex at {datetime.now(UTC).isoformat()}"
 
-        sha = porcelain.commit(
-            str(self.shadow_root),
+        try:
+            parent: bytes | None = self.repo.head()
+        except KeyError:
+            parent = None
+
+        sha = worktree.commit(
             message=message.encode("utf-8"),
             author=_AUTHOR,
             committer=_AUTHOR,
         )
+
+        # Bump the memoized count instead of re-walking history
+        cached = self._commit_count_cache
+        if parent is None:
+            self._commit_count_cache = (sha, 1)
+        elif cached is not None and cached[0] == parent:
+            self._commit_count_cache = (sha, cached[1] + 1)
+
+        self._clean_signature = signature
+
         short_hash = sha.decode("ascii")[:8]
         logger.info("Committed changes: %s — %s", short_hash, message)
 
         # Cleanup if needed
-        commit_count = self._commit_count()
+        commit_count = self._commit_count(limit=self.max_backups)
         if commit_count >= self.max_backups:
             commits_to_keep = max(10, self.max_backups - 10)
             logger.info(
@@ -216,9 +516,7 @@ class GitManager:
                 commits_to_keep,
             )
             try:
-                truncate_history(self.shadow_root, commits_to_keep)
-                # Reload repo after truncation
-                self._repo = Repo(str(self.shadow_root))
+                self._reload_after_truncation(truncate_history(self.shadow_root, commits_to_keep))
             except Exception as exc:
                 logger.warning("Cleanup failed: %s", exc)
 
@@ -243,7 +541,7 @@ class GitManager:
             return None
 
         try:
-            return await asyncio.to_thread(self._commit_changes_sync, message, force=force)
+            return await self._run_blocking(self._commit_changes_sync, message, force=force)
         except Exception as exc:
             logger.error("Failed to commit changes: %s", exc)
             return None
@@ -252,6 +550,38 @@ class GitManager:
     # Checkpoint
     # ------------------------------------------------------------------
 
+    def _create_checkpoint_sync(self, user_request: str) -> tuple[str | None, str, str]:
+        """Commit and tag in one executor job; returns ``(hash, timestamp, tag)``."""
+        message = f"Checkpoint before: {user_request}"
+        try:
+            commit_hash = self._commit_changes_sync(message, force=True)
+        except Exception as exc:
+            logger.error("Failed to commit changes: %s", exc)
+            commit_hash = None
+
+        if not commit_hash:
+            try:
+                commit_hash = self.repo.head().decode("ascii")[:8]
+            except Exception:
+                commit_hash = None
+
+        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        tag_name = f"checkpoint_{timestamp}"
+
+        if commit_hash:
+            try:
+                porcelain.tag_create(
+                    self.repo,
+                    tag_name.encode("utf-8"),
+                    message=message.encode(),
+                    author=_AUTHOR,
+                )
+                logger.info("Created checkpoint tag: %s", tag_name)
+            except Exception as exc:
+                logger.warning("Failed to create tag: %s", exc)
+
+        return commit_hash, timestamp, tag_name
+
     async def create_checkpoint(self, user_request: str) -> CheckpointResult:
         """Create a tagged checkpoint before a multi-step operation."""
         if self._repo is None:
@@ -263,34 +593,9 @@ class GitManager:
             )
 
         try:
-            commit_hash = await self.commit_changes(
-                f"Checkpoint before: {user_request}",
-                skip_if_processing=False,
-                force=True,
+            commit_hash, timestamp, tag_name = await self._run_blocking(
+                self._create_checkpoint_sync, user_request
             )
-
-            if not commit_hash:
-                try:
-                    commit_hash = self.repo.head().decode("ascii")[:8]
-                except Exception:
-                    commit_hash = None
-
-            timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
-            tag_name = f"checkpoint_{timestamp}"
-
-            if commit_hash:
-                try:
-                    await asyncio.to_thread(
-                        porcelain.tag_create,
-                        str(self.shadow_root),
-                        tag_name.encode("utf-8"),
-                        message=f"Checkpoint before: {user_request}".encode(),
-                        author=_AUTHOR,
-                    )
-                    logger.info("Created checkpoint tag: %s", tag_name)
-                except Exception as exc:
-                    logger.warning("Failed to create tag: %s", exc)
-
             self.processing_request = True
 
             return CheckpointResult(
@@ -333,7 +638,7 @@ class GitManager:
 
     async def begin_transaction(self, context: dict[str, Any] | None = None) -> TransactionState:
         """Start a new persistent transaction for staged file operations."""
-        return await asyncio.to_thread(self._begin_transaction_sync, context)
+        return await self._run_blocking(self._begin_transaction_sync, context)
 
     def _stage_operation_sync(
         self,
@@ -346,6 +651,21 @@ class GitManager:
                 f"Cannot stage operations for transaction in state {transaction.status}"
             )
 
+        if operation.content is not None and len(operation.content) > _INLINE_CONTENT_LIMIT:
+            blob_dir = self._blob_dir(transaction_id)
+            blob_dir.mkdir(parents=True, exist_ok=True)
+            blob = blob_dir / f"{len(transaction.operations)}.bin"
+            # Write aside and rename so a crash never leaves a partial blob
+            partial = blob.with_suffix(".tmp")
+            _write_blob(str(partial), operation.content.encode("utf-8"))
+            os.replace(partial, blob)
+            operation = operation.model_copy(
+                update={
+                    "content": None,
+                    "content_ref": blob.relative_to(self.transaction_dir).as_posix(),
+                }
+            )
+
         transaction.operations.append(operation)
         transaction.status = "open"
         transaction.updated_at = datetime.now(UTC)
@@ -360,15 +680,15 @@ class GitManager:
     ) -> TransactionState:
         """Stage a file write operation."""
         operation = TransactionOperation(op="write", path=path, content=content)
-        return await asyncio.to_thread(self._stage_operation_sync, transaction_id, operation)
+        return await self._run_blocking(self._stage_operation_sync, transaction_id, operation)
 
     async def stage_file_delete(self, transaction_id: str, path: str) -> TransactionState:
         """Stage a file delete operation."""
         operation = TransactionOperation(op="delete", path=path, content=None)
-        return await asyncio.to_thread(self._stage_operation_sync, transaction_id, operation)
+        return await self._run_blocking(self._stage_operation_sync, transaction_id, operation)
 
-    def _validate_transaction_sync(self, transaction_id: str) -> TransactionValidationResult:
-        transaction = self._load_transaction_sync(transaction_id)
+    def _check_transaction(self, transaction: TransactionState) -> TransactionValidationResult:
+        """Validate *transaction* in memory, updating its status but not saving it."""
         errors: list[str] = []
 
         if not transaction.operations:
@@ -379,18 +699,23 @@ class GitManager:
                 self._resolve_config_path(operation.path)
             except GitError as exc:
                 errors.append(str(exc))
-            if operation.op == "write" and operation.content is None:
+            if operation.op == "write" and operation.content is None and not operation.content_ref:
                 errors.append(f"Write operation missing content for {operation.path}")
 
         is_valid = not errors
         transaction.status = "validated" if is_valid else "failed"
         transaction.updated_at = datetime.now(UTC)
-        self._save_transaction_sync(transaction)
         return TransactionValidationResult(valid=is_valid, errors=errors)
 
+    def _validate_transaction_sync(self, transaction_id: str) -> TransactionValidationResult:
+        transaction = self._load_transaction_sync(transaction_id)
+        validation = self._check_transaction(transaction)
+        self._save_transaction_sync(transaction)
+        return validation
+
     async def validate_transaction(self, transaction_id: str) -> TransactionValidationResult:
         """Validate staged operations before apply."""
-        return await asyncio.to_thread(self._validate_transaction_sync, transaction_id)
+        return await self._run_blocking(self._validate_transaction_sync, transaction_id)
 
     def _rollback_failed_transaction_sync(
         self,
@@ -409,18 +734,32 @@ class GitManager:
 
             relative_name = backup_path.relative_to(backup_dir).as_posix()
             target = self._resolve_config_path(relative_name)
-            target.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(backup_path, target)
+            if target.exists():
+                # Rewriting in place keeps the file's own mode
+                shutil.copyfile(backup_path, target)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(backup_path, target)
+
+    def _apply_transaction_operation(self, target: Path, operation: TransactionOperation) -> None:
+        if operation.op == "write" and operation.content_ref is not None:
+            shutil.copyfile(self.transaction_dir / operation.content_ref, target)
+        elif operation.op == "write":
+            target.write_text(operation.content or "", encoding="utf-8")
+        elif target.exists():
+            target.unlink()
 
     def _commit_transaction_sync(
         self,
         transaction_id: str,
         message: str | None = None,
     ) -> TransactionCommitResult:
+        # Load once and validate in memory; the intermediate "validated" state
+        # is never persisted since it is overwritten by the outcome below
         transaction = self._load_transaction_sync(transaction_id)
-        validation = self._validate_transaction_sync(transaction_id)
-        transaction = self._load_transaction_sync(transaction_id)
+        validation = self._check_transaction(transaction)
         if not validation.valid:
+            self._save_transaction_sync(transaction)
             return TransactionCommitResult(
                 success=False,
                 transaction=transaction,
@@ -434,23 +773,39 @@ class GitManager:
         rollback_metadata = TransactionRollbackMetadata()
 
         try:
+            # Plan first: each path is backed up once, in its original state,
+            # and only its last operation is applied. Metadata keeps the
+            # operation order.
+            backups: list[tuple[Path, Path]] = []
+            final_ops: dict[Path, TransactionOperation] = {}
             for operation in transaction.operations:
                 target = self._resolve_config_path(operation.path)
                 rollback_metadata.touched_paths.append(operation.path)
-
-                if target.exists():
-                    backup_target = backup_dir / operation.path
-                    backup_target.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(target, backup_target)
-                    rollback_metadata.backup_files.append(str(backup_target))
-                elif operation.op == "write":
-                    rollback_metadata.created_files.append(operation.path)
-
-                if operation.op == "write":
-                    target.parent.mkdir(parents=True, exist_ok=True)
-                    target.write_text(operation.content or "", encoding="utf-8")
-                elif target.exists():
-                    target.unlink()
+                if target not in final_ops:
+                    if target.exists():
+                        backup_target = backup_dir / operation.path
+                        backups.append((target, backup_target))
+                        rollback_metadata.backup_files.append(str(backup_target))
+                    elif operation.op == "write":
+                        rollback_metadata.created_files.append(operation.path)
+                final_ops[target] = operation
+
+            # Then copy backups and apply operations in parallel; targets are
+            # distinct paths, and copy/write release the GIL during I/O
+            # Rollback only needs the contents of files that stay in place
+            # (copyfile skips copystat's extra syscalls); files about to be
+            # deleted keep their mode and times so they can be recreated as-is
+            deleted = {t for t, op in final_ops.items() if op.op == "delete"}
+
+            def backup(source: Path, dest: Path) -> None:
+                (shutil.copy2 if source in deleted else shutil.copyfile)(source, dest)
+
+            for parent in {dest.parent for _, dest in backups}:
+                parent.mkdir(parents=True, exist_ok=True)
+            _run_parallel(backup, backups)
+            for parent in {t.parent for t, op in final_ops.items() if op.op == "write"}:
+                parent.mkdir(parents=True, exist_ok=True)
+            _run_parallel(self._apply_transaction_operation, final_ops.items())
 
             commit_hash = self._commit_changes_sync(
                 message or f"Transaction apply: {transaction_id}",
@@ -461,6 +816,7 @@ class GitManager:
             transaction.updated_at = datetime.now(UTC)
             transaction.rollback_metadata = rollback_metadata
             self._save_transaction_sync(transaction)
+            shutil.rmtree(self._blob_dir(transaction_id), ignore_errors=True)
             return TransactionCommitResult(
                 success=True,
                 transaction=transaction,
@@ -469,7 +825,6 @@ class GitManager:
             )
         except Exception as exc:
             self._rollback_failed_transaction_sync(backup_dir, rollback_metadata)
-            transaction = self._load_transaction_sync(transaction_id)
             transaction.status = "failed"
             transaction.updated_at = datetime.now(UTC)
             transaction.rollback_metadata = rollback_metadata
@@ -488,7 +843,7 @@ class GitManager:
         message: str | None = None,
     ) -> TransactionCommitResult:
         """Validate and apply staged operations atomically."""
-        return await asyncio.to_thread(self._commit_transaction_sync, transaction_id, message)
+        return await self._run_blocking(self._commit_transaction_sync, transaction_id, message)
 
     def _abort_transaction_sync(self, transaction_id: str) -> TransactionAbortResult:
         transaction = self._load_transaction_sync(transaction_id)
@@ -498,30 +853,35 @@ class GitManager:
         transaction.status = "aborted"
         transaction.updated_at = datetime.now(UTC)
         self._save_transaction_sync(transaction)
+        shutil.rmtree(self._blob_dir(transaction_id), ignore_errors=True)
         return TransactionAbortResult(success=True, transaction=transaction)
 
     async def abort_transaction(self, transaction_id: str) -> TransactionAbortResult:
         """Abort a pending transaction without applying staged operations."""
-        return await asyncio.to_thread(self._abort_transaction_sync, transaction_id)
+        return await self._run_blocking(self._abort_transaction_sync, transaction_id)
 
     # ------------------------------------------------------------------
     # History
     # ------------------------------------------------------------------
 
-    def _get_history_sync(self, limit: int = 20) -> list[dict[str, Any]]:
-        """Synchronous implementation — called via ``asyncio.to_thread``."""
-        commits: list[dict[str, Any]] = []
-        walker = self.repo.get_walker(max_entries=limit)
-        for entry in walker:
+    def _get_history_sync(self, limit: int = 20) -> list[CommitInfo]:
+        """Synchronous implementation — run on the git executor."""
+        commits: list[CommitInfo] = []
+        fromtimestamp = datetime.fromtimestamp
+        construct = CommitInfo.model_construct
+        for entry in self.repo.get_walker(max_entries=limit):
             commit = entry.commit
+            # Fields are built here from trusted repo data, so skip validation
             commits.append(
-                {
-                    "hash": commit.id.decode("ascii")[:8],
-                    "message": commit.message.decode("utf-8", errors="replace").strip(),
-                    "author": commit.author.decode("utf-8", errors="replace"),
-                    "date": datetime.fromtimestamp(commit.commit_time, tz=UTC).isoformat(),
-                    "files_changed": len(commit.parents),  # Approximation
-                }
+                construct(
+                    hash=commit.id[:8].decode("ascii"),
+                    message=commit.message.decode("utf-8", errors="replace").strip(),
+                    author=commit.author.decode("utf-8", errors="replace"),
+                    date=fromtimestamp(commit.commit_time, tz=UTC).isoformat(),
+                    # Paths changed against the parent(s); unchanged subtrees are
+                    # skipped by hash, so this is proportional to the change size
+                    files_changed=len(entry.changes()),
+                )
             )
         return commits
 
@@ -531,8 +891,7 @@ class GitManager:
             return []
 
         try:
-            history = await asyncio.to_thread(self._get_history_sync, limit)
-            return [CommitInfo.model_validate(commit) for commit in history]
+            return await self._run_blocking(self._get_history_sync, limit)
         except Exception as exc:
             logger.error("Failed to get history: %s", exc)
             return []
@@ -542,42 +901,75 @@ class GitManager:
     # ------------------------------------------------------------------
 
     def _get_pending_changes_sync(self) -> dict[str, Any]:
-        """Synchronous implementation — called via ``asyncio.to_thread``."""
+        """Synchronous implementation — run on the git executor."""
+        # Shares commit_changes' clean-state signature: if the config is unchanged
+        # since the shadow tree was last clean, there is nothing to sync or report
+        unchanged, signature = self._check_config_signature()
+        if unchanged:
+            return {
+                "has_changes": False,
+                "files_modified": [],
+                "files_added": [],
+                "files_deleted": [],
+                "summary": {"modified": 0, "added": 0, "deleted": 0, "total": 0},
+                "diff": "",
+            }
+
+        try:
+            head: bytes | None = self.repo.head()
+        except KeyError:
+            head = None
+        cache_key = (signature, head) if signature is not None else None
+        cached = self._pending_cache
+        if cache_key is not None and cached is not None and cached[0] == cache_key:
+            return dict(cached[1])
+
         sync_config_to_shadow(
             self.config_path,
             self.shadow_root,
             shadow_dir_name=self.shadow_dir_name,
         )
 
-        status = porcelain.status(str(self.shadow_root))
-
-        files_modified: list[str] = []
-        files_added: list[str] = []
-        files_deleted: list[str] = []
+        status = porcelain.status(self.repo)
 
-        # Staged changes
-        for p in status.staged.get("add", []):
-            files_added.append(p.decode("utf-8", errors="replace"))
-        for p in status.staged.get("delete", []):
-            files_deleted.append(p.decode("utf-8", errors="replace"))
-        for p in status.staged.get("modify", []):
-            files_modified.append(p.decode("utf-8", errors="replace"))
+        def decode(p: str | bytes) -> str:
+            return p if isinstance(p, str) else p.decode("utf-8", errors="replace")
 
-        # Unstaged changes
-        for p in status.unstaged:
-            path_str = p.decode("utf-8", errors="replace")
-            if path_str not in files_modified:
-                files_modified.append(path_str)
-
-        # Untracked files
-        for p in status.untracked:
-            path_str = p if isinstance(p, str) else p.decode("utf-8", errors="replace")
-            if path_str not in files_added:
-                files_added.append(path_str)
+        # Insertion-ordered dicts de-duplicate in O(1) per path, unlike list scans
+        staged = status.staged
+        files_deleted = [decode(p) for p in staged.get("delete", [])]
+        # Staged changes, then unstaged changes
+        modified = dict.fromkeys(map(decode, staged.get("modify", [])))
+        modified.update(dict.fromkeys(map(decode, status.unstaged)))
+        # Staged additions, then untracked files
+        added = dict.fromkeys(map(decode, staged.get("add", [])))
+        added.update(dict.fromkeys(map(decode, status.untracked)))
+        files_modified = list(modified)
+        files_added = list(added)
 
         has_changes = bool(files_modified or files_added or files_deleted)
+        if not has_changes:
+            self._clean_signature = signature
+
+        # The diff stages the same dirty paths this status just found, so hand
+        # them over instead of letting it rescan; an untracked directory
+        # ("normal" mode does not expand it) falls back to a full scan
+        diff = ""
+        diff_ok = True
+        if has_changes and head is not None:
+            untracked = [_fs_path(p) for p in status.untracked]
+            to_stage: list[str] | None = None
+            if not any(p.endswith("/") for p in untracked):
+                to_stage = [*map(_fs_path, status.unstaged), *untracked]
+            try:
+                buf = io.BytesIO()
+                self._write_worktree_diff_sync(buf, head, to_stage)
+                diff = buf.getvalue().decode("utf-8", errors="replace")
+            except Exception as exc:
+                logger.debug("Failed to build pending diff: %s", exc)
+                diff_ok = False
 
-        return {
+        result: dict[str, Any] = {
             "has_changes": has_changes,
             "files_modified": files_modified,
             "files_added": files_added,
@@ -588,7 +980,11 @@ class GitManager:
                 "deleted": len(files_deleted),
                 "total": len(files_modified) + len(files_added) + len(files_deleted),
             },
+            "diff": diff,
         }
+        cacheable = has_changes and diff_ok
+        self._pending_cache = (cache_key, result) if cacheable and cache_key else None
+        return dict(result)
 
     async def get_pending_changes(self) -> PendingChanges:
         """Return uncommitted changes between config and the last commit."""
@@ -605,16 +1001,9 @@ class GitManager:
             return empty
 
         try:
-            result = await asyncio.to_thread(self._get_pending_changes_sync)
-
-            if result["has_changes"]:
-                try:
-                    result["diff"] = await self.get_diff()
-                except Exception:
-                    result["diff"] = ""
-            else:
-                result["diff"] = ""
-
+            # Status and diff share one executor job, and the diff reuses the
+            # status scan rather than walking the worktree a second time
+            result = await self._run_blocking(self._get_pending_changes_sync)
             return PendingChanges.model_validate(result)
         except Exception as exc:
             logger.error("Failed to get pending changes: %s", exc)
@@ -624,49 +1013,80 @@ class GitManager:
     # Diff
     # ------------------------------------------------------------------
 
-    def _get_diff_sync(
+    def _write_diff_sync(
         self,
+        out: _BytesSink,
         commit1: str | None = None,
         commit2: str | None = None,
-    ) -> str:
-        """Synchronous implementation — called via ``asyncio.to_thread``."""
-        import io
-
-        from dulwich.patch import write_tree_diff
-
+    ) -> None:
+        """Write the diff selected by *commit1*/*commit2* to *out* as bytes."""
         repo = self.repo
-        buf = io.BytesIO()
-
-        if commit1 and commit2:
-            tree1 = repo.get_object(commit1.encode()).tree
-            tree2 = repo.get_object(commit2.encode()).tree
-            write_tree_diff(buf, repo.object_store, tree1, tree2)
-        elif commit1:
-            tree1 = repo.get_object(commit1.encode()).tree
-            head_commit = repo.get_object(repo.head())
-            write_tree_diff(buf, repo.object_store, tree1, head_commit.tree)
+        store = repo.object_store
+
+        if commit1:
+            tree1 = repo.get_object(self._resolve_commit_sha(commit1)).tree
+            tree2 = repo.get_object(
+                self._resolve_commit_sha(commit2) if commit2 else repo.head()
+            ).tree
+            # Same tree (e.g. a commit against itself): nothing to read or write
+            if tree1 != tree2:
+                write_tree_diff(out, store, tree1, tree2)
         else:
             # Diff against HEAD
             try:
-                head_commit = repo.get_object(repo.head())
-                head_tree = head_commit.tree
+                head = repo.head()
             except KeyError:
-                return ""
+                return
+            self._write_worktree_diff_sync(out, head)
 
-            # Stage everything to get a complete diff
-            porcelain.add(str(self.shadow_root), paths=None)
-            index = repo.open_index()
+    def _write_worktree_diff_sync(
+        self,
+        out: _BytesSink,
+        head: bytes,
+        to_stage: list[str] | None = None,
+    ) -> None:
+        """Write the diff between commit *head* and the shadow worktree to *out*.
+
+        *to_stage* lists the dirty paths to stage first; when ``None`` they are
+        found with a status scan.
+        """
+        repo = self.repo
+        store = repo.object_store
+        head_tree = repo.get_object(head).tree
 
-            from dulwich.diff_tree import tree_changes
+        # Stage exactly the paths status reports as dirty, the same way
+        # commits do, rather than porcelain.add re-scanning the worktree
+        if to_stage is None:
+            _, to_stage = self._dirty_state()
+        if to_stage:
+            repo.get_worktree().stage(to_stage)
+        index = repo.open_index()
 
-            index_tree = index.commit(repo.object_store)
-            for change in tree_changes(repo.object_store, head_tree, index_tree):
-                old_path = change.old.path.decode() if change.old.path else "/dev/null"
-                new_path = change.new.path.decode() if change.new.path else "/dev/null"
-                buf.write(f"diff --git a/{old_path} b/{new_path}\n".encode())
+        # A full patch of the staged tree, not just per-file headers
+        write_tree_diff(out, store, head_tree, index.commit(store))
 
+    def _get_diff_sync(
+        self,
+        commit1: str | None = None,
+        commit2: str | None = None,
+    ) -> str:
+        """Synchronous implementation — run on the git executor."""
+        buf = io.BytesIO()
+        self._write_diff_sync(buf, commit1, commit2)
         return buf.getvalue().decode("utf-8", errors="replace")
 
+    def _stream_diff_sync(
+        self,
+        writer: _DiffChunkWriter,
+        commit1: str | None,
+        commit2: str | None,
+    ) -> None:
+        """Producer side of :meth:`stream_diff` — run on the git executor."""
+        try:
+            self._write_diff_sync(writer, commit1, commit2)
+        finally:
+            writer.finish()
+
     async def get_diff(
         self,
         commit1: str | None = None,
@@ -677,17 +1097,66 @@ class GitManager:
             return ""
 
         try:
-            return await asyncio.to_thread(self._get_diff_sync, commit1, commit2)
+            return await self._run_blocking(self._get_diff_sync, commit1, commit2)
         except Exception as exc:
             logger.error("Failed to get diff: %s", exc)
             return ""
 
+    async def stream_diff(
+        self,
+        commit1: str | None = None,
+        commit2: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield the diff selected as for :meth:`get_diff` in text chunks.
+
+        The diff is generated in a worker thread and decoded incrementally,
+        so the full diff is never held in memory at once.  The producer holds
+        the manager's git lock until the stream is drained or closed, so the
+        consuming task must not call back into this manager meanwhile; such
+        calls raise :class:`GitError` instead of deadlocking.
+        """
+        if self._repo is None:
+            raise GitNotInitializedError("Git repository not available")
+
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=_DIFF_QUEUE_SIZE)
+        writer = _DiffChunkWriter(asyncio.get_running_loop(), queue)
+        producer = asyncio.ensure_future(
+            self._run_blocking(self._stream_diff_sync, writer, commit1, commit2)
+        )
+        consumer = asyncio.current_task()
+        if consumer is not None:
+            self._stream_consumers.add(consumer)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while (chunk := await queue.get()) is not None:
+                if text := decoder.decode(chunk):
+                    yield text
+            if tail := decoder.decode(b"", final=True):
+                yield tail
+            await producer
+        except (GitNotInitializedError, GitError):
+            raise
+        except Exception as exc:
+            logger.error("Failed to stream diff: %s", exc)
+            raise GitError(f"Diff failed: {exc}") from exc
+        finally:
+            if consumer is not None:
+                self._stream_consumers.discard(consumer)
+            if not producer.done():
+                # Consumer stopped early: unblock the producer and let it exit
+                writer.cancelled = True
+                while not producer.done():
+                    while not queue.empty():
+                        queue.get_nowait()
+                    await asyncio.wait({producer}, timeout=0.05)
+                producer.exception()
+
     # ------------------------------------------------------------------
     # Rollback
     # ------------------------------------------------------------------
 
     def _rollback_sync(self, commit_hash: str) -> dict[str, Any]:
-        """Synchronous implementation — called via ``asyncio.to_thread``."""
+        """Synchronous implementation — run on the git executor."""
         self._commit_changes_sync(f"Before rollback to {commit_hash}", force=True)
 
         porcelain.reset(
@@ -695,6 +1164,9 @@ class GitManager:
             "hard",
             treeish=commit_hash.encode("utf-8"),
         )
+        self._commit_count_cache = None
+        self._clean_signature = None
+        self._pending_cache = None
 
         sync_shadow_to_config(
             self.shadow_root,
@@ -716,7 +1188,7 @@ class GitManager:
             raise GitNotInitializedError("Git versioning not enabled")
 
         try:
-            result = await asyncio.to_thread(self._rollback_sync, commit_hash)
+            result = await self._run_blocking(self._rollback_sync, commit_hash)
             return RollbackResult.model_validate(result)
         except (GitNotInitializedError, GitError):
             raise
@@ -733,46 +1205,61 @@ class GitManager:
         commit_hash: str | None = None,
         file_patterns: list[str] | None = None,
     ) -> dict[str, Any]:
-        """Synchronous implementation — called via ``asyncio.to_thread``."""
+        """Synchronous implementation — run on the git executor."""
         repo = self.repo
         if not commit_hash:
             commit_hash = repo.head().decode("ascii")
 
-        commit_sha = commit_hash.encode("ascii") if len(commit_hash) < 40 else commit_hash.encode()
-        # Resolve short hash
-        full_sha = None
-        for sha in repo.object_store:
-            if sha.decode("ascii").startswith(commit_hash):
-                full_sha = sha
-                break
-        if full_sha is None:
-            full_sha = commit_sha
+        commit_obj = repo.get_object(self._resolve_commit_sha(commit_hash))
 
-        commit_obj = repo.get_object(full_sha)
-        tree = repo.get_object(commit_obj.tree)
+        # One combined regex instead of an fnmatch call per pattern per blob
+        match = (
+            re.compile("|".join(fnmatch.translate(p) for p in file_patterns)).match
+            if file_patterns
+            else None
+        )
+        # Subtrees outside every pattern's literal prefix cannot match: skip them
+        prefixes = [_literal_prefix(p).encode("utf-8") for p in file_patterns or ()]
+        keep_dir = (
+            None
+            if not prefixes or b"" in prefixes
+            else lambda d: any(p.startswith(d) or d.startswith(p) for p in prefixes)
+        )
 
         restored_files: list[str] = []
-
-        def _walk_tree(tree_obj: Any, prefix: str = "") -> None:
-            for item in tree_obj.items():
-                name = item.path.decode("utf-8", errors="replace")
-                full_name = f"{prefix}{name}" if not prefix else f"{prefix}/{name}"
-                obj = repo.get_object(item.sha)
-                if obj.type_name == b"tree":
-                    _walk_tree(obj, full_name)
-                elif obj.type_name == b"blob":
-                    if file_patterns:
-                        import fnmatch
-
-                        if not any(fnmatch.fnmatch(full_name, p) for p in file_patterns):
-                            return
-                    # Write blob to shadow worktree
-                    dest = self.shadow_root / full_name
-                    dest.parent.mkdir(parents=True, exist_ok=True)
-                    dest.write_bytes(obj.data)
-                    restored_files.append(full_name)
-
-        _walk_tree(tree)
+        # Flat, iterative walk; loop-invariant lookups bound to locals
+        store = repo.object_store
+        shadow_root = str(self.shadow_root)
+        created_dirs: set[str] = set()
+
+        # Trees often repeat a small blob (empty files, copied snippets);
+        # decompress each one once per restore.  Local, so nothing outlives
+        # this call.
+        small_blobs: dict[ObjectID, bytes] = {}
+        cache_budget = _RESTORE_BLOB_CACHE_BYTES
+
+        for entry in _iter_tree_files(store, commit_obj.tree, keep_dir):
+            if S_ISGITLINK(entry.mode):
+                continue
+            full_name = entry.path.decode("utf-8", errors="replace")
+            if match is not None and not match(full_name):
+                continue
+            # Write blob to shadow worktree
+            dest = os.path.join(shadow_root, full_name)
+            parent = os.path.dirname(dest)
+            if parent not in created_dirs:
+                os.makedirs(parent, exist_ok=True)
+                created_dirs.add(parent)
+            data = small_blobs.get(entry.sha)
+            if data is None:
+                data = store[entry.sha].data
+                if len(data) <= min(_RESTORE_BLOB_CACHE_ITEM_BYTES, cache_budget):
+                    small_blobs[entry.sha] = data
+                    cache_budget -= len(data)
+            _write_blob(dest, data)
+            restored_files.append(full_name)
+        self._clean_signature = None
+        self._pending_cache = None
 
         # Sync to config
         sync_shadow_to_config(
@@ -799,7 +1286,7 @@ class GitManager:
             raise GitNotInitializedError("Git repository not available")
 
         try:
-            result = await asyncio.to_thread(
+            result = await self._run_blocking(
                 self._restore_files_from_commit_sync, commit_hash, file_patterns
             )
             return RestoreFilesResult.model_validate(result)
@@ -814,7 +1301,7 @@ class GitManager:
     # ------------------------------------------------------------------
 
     def _cleanup_commits_sync(self) -> dict[str, Any]:
-        """Synchronous implementation — called via ``asyncio.to_thread``."""
+        """Synchronous implementation — run on the git executor."""
         commits_before = self._commit_count()
         if commits_before <= self.max_backups:
             return {
@@ -827,7 +1314,7 @@ class GitManager:
             }
 
         commits_after = truncate_history(self.shadow_root, self.max_backups)
-        self._repo = Repo(str(self.shadow_root))
+        self._reload_after_truncation(commits_after)
         logger.info("Manual cleanup: %d → %d commits", commits_before, commits_after)
         return {
             "success": True,
@@ -847,7 +1334,7 @@ class GitManager:
             )
 
         try:
-            result = await asyncio.to_thread(self._cleanup_commits_sync)
+            result = await self._run_blocking(self._cleanup_commits_sync)
             return CleanupResult.model_validate(result)
         except Exception as exc:
             logger.error("Cleanup failed: %s", exc)
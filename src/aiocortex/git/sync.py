@@ -7,86 +7,297 @@ Filesystem-only — no git operations.
 
 from __future__ import annotations
 
+import errno
 import logging
 import os
 import shutil
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from .filters import should_include_path
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Linux reflink ioctl; ``None`` where unavailable (macOS, Windows)
+_FICLONE: int | None = getattr(fcntl, "FICLONE", None) if fcntl is not None else None
+# Errors meaning "this filesystem can't reflink" rather than a real I/O failure
+_NO_REFLINK_ERRNOS = frozenset({errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS})
+# Destination devices on which a reflink attempt has already failed
+_no_reflink_devs: set[int] = set()
+
+# Shadow-tree directories that never mirror config content
+_SHADOW_PRUNE_DIRS: frozenset[str] = frozenset({".git", "export"})
+
+# Copies are dominated by per-file syscall latency rather than CPU, so use
+# more threads than cores
+_COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+# Files modified this close to a scan may change again without a visible mtime
+# bump (coarse filesystem timestamps), so their metadata is never trusted.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def _shadow_copy_is_current(src: Path, dst: Path, racy_cutoff_ns: int) -> bool:
+    """Return ``True`` if *dst* is an up-to-date copy of *src*.
+
+    Copies preserve mtime, so matching size, mode and ``st_mtime_ns``
+    mean the file has not changed since it was last copied — unless *src*
+    was modified too recently for its mtime to be trusted.
+    """
+    try:
+        src_st = os.stat(src)
+        dst_st = os.stat(dst)
+    except OSError:
+        return False
+    return (
+        src_st.st_mtime_ns == dst_st.st_mtime_ns
+        and src_st.st_size == dst_st.st_size
+        and src_st.st_mode == dst_st.st_mode
+        and src_st.st_mtime_ns < racy_cutoff_ns
+    )
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Equivalent of ``shutil.copy2`` that reflinks on copy-on-write filesystems.
+
+    On btrfs/XFS (and any filesystem supporting ``FICLONE``) the copy shares
+    extents with *src* and moves no data.  Filesystems that reject the ioctl
+    are remembered per device and go straight to ``shutil.copy2`` afterwards.
+    """
+    if _FICLONE is not None:
+        dev = os.stat(dst.parent).st_dev
+        if dev not in _no_reflink_devs:
+            try:
+                with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                    fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError as exc:
+                if exc.errno in _NO_REFLINK_ERRNOS:
+                    _no_reflink_devs.add(dev)
+                elif exc.errno != errno.EXDEV:
+                    raise
+            else:
+                shutil.copystat(src, dst)
+                return
+    shutil.copy2(src, dst)
+
+
+def _copy_to_shadow(src: Path, dst: Path) -> bool:
+    """Copy *src* to *dst* with metadata; return ``False`` (and log) on failure."""
+    try:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        _fast_copy(src, dst)
+    except Exception as exc:
+        logger.warning("Failed to copy %s to shadow repo: %s", src, exc)
+        return False
+    return True
+
+
+def _scan_files(
+    root: Path,
+    descend: Callable[[str, str], bool],
+) -> Iterator[str]:
+    """Yield forward-slash relative paths of non-directory entries under *root*.
+
+    A stack-based ``os.scandir`` walk: directory type comes from the cached
+    ``DirEntry`` data, and relative paths are built incrementally instead of
+    via ``relpath``/``normpath``.  ``descend(rel_dir, name)`` decides whether
+    a directory is entered; symlinked directories never are (as with
+    ``os.walk``'s default).  Unreadable directories are skipped.
+    """
+    stack: list[tuple[str, str]] = [(str(root), "")]
+    while stack:
+        dir_path, rel_root = stack.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    rel_path = rel_root + entry.name
+                    if entry.is_dir():
+                        if not entry.is_symlink() and descend(rel_path, entry.name):
+                            stack.append((entry.path, rel_path + "/"))
+                    else:
+                        yield rel_path
+        except OSError as exc:
+            logger.debug("Failed to scan %s: %s", dir_path, exc)
+
+
+def _scan_config_files(config_path: Path, shadow_dir_name: str) -> Iterator[str]:
+    """Yield relative paths of trackable files in *config_path*.
+
+    ``.git`` and the shadow repo are pruned at every level, not just the top:
+    a nested repository (e.g. ``custom_components/foo/.git``) is never tracked,
+    so it must not look tracked-but-missing to ``delete_missing``.
+    """
+    skip_dirs = {".git", shadow_dir_name}
+    for rel_path in _scan_files(
+        config_path,
+        lambda rel_dir, name: (
+            name not in skip_dirs
+            and should_include_path(rel_dir, is_dir=True, shadow_dir_name=shadow_dir_name)
+        ),
+    ):
+        if should_include_path(rel_path, is_dir=False, shadow_dir_name=shadow_dir_name):
+            yield rel_path
+
+
+def _walk_shadow_files(shadow_root: Path) -> Iterator[str]:
+    """Yield forward-slash relative paths of files in the shadow worktree.
+
+    ``.git/`` and ``export/`` are pruned and never descended into.
+    """
+    return _scan_files(
+        shadow_root,
+        lambda rel_dir, name: name not in _SHADOW_PRUNE_DIRS and not rel_dir.startswith("export"),
+    )
+
+
+def config_tree_signature(
+    config_path: Path,
+    *,
+    shadow_dir_name: str = "cortex_git",
+) -> tuple[int, int]:
+    """Return a cheap change signature for the trackable files in *config_path*.
+
+    The signature is ``(fingerprint, newest st_mtime_ns)`` over trackable
+    files and the directories containing them, gathered from a single
+    ``os.scandir`` pass.  The fingerprint folds in every file's path, size,
+    mode and mtime and every directory's mtime, so edits that carry an older
+    mtime (``cp -p``, ``touch -r``, restores) still change it.  If the
+    signature matches the one taken at the last clean sync, nothing needs to
+    be synced.  Fingerprints use ``hash()`` and are only comparable within
+    one process.
+    """
+    # Order-independent sum, since scandir order is not guaranteed
+    fingerprint = 0
+    newest = 0
+    skip_dirs = {".git", shadow_dir_name}
+    stack: list[tuple[str, str]] = [(str(config_path), "")]
+    while stack:
+        dir_path, rel_root = stack.pop()
+        try:
+            dir_mtime = os.stat(dir_path).st_mtime_ns
+            newest = max(newest, dir_mtime)
+            fingerprint += hash((rel_root, dir_mtime))
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    rel_path = f"{rel_root}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        # Same pruning as _scan_config_files
+                        if entry.name not in skip_dirs and should_include_path(
+                            rel_path, is_dir=True, shadow_dir_name=shadow_dir_name
+                        ):
+                            stack.append((entry.path, f"{rel_path}/"))
+                        continue
+                    if not entry.is_file() or not should_include_path(
+                        rel_path, is_dir=False, shadow_dir_name=shadow_dir_name
+                    ):
+                        continue
+                    st = entry.stat()
+                    newest = max(newest, st.st_mtime_ns)
+                    fingerprint += hash((rel_path, st.st_size, st.st_mode, st.st_mtime_ns))
+        except OSError as exc:
+            logger.debug("Failed to scan %s for changes: %s", dir_path, exc)
+    return fingerprint & 0xFFFFFFFFFFFFFFFF, newest
+
 
 def sync_config_to_shadow(
     config_path: Path,
     shadow_root: Path,
     *,
     shadow_dir_name: str = "cortex_git",
-) -> None:
+    changed_paths: Iterable[str] | None = None,
+) -> set[str] | None:
     """Copy trackable files from *config_path* into *shadow_root*.
 
     Files that were in the shadow tree but no longer exist in config are
     removed (except for ``export/`` and ``.git/``).
+
+    Returns the forward-slash relative paths now tracked in the shadow tree,
+    suitable for :func:`sync_shadow_to_config`'s *config_paths*, or ``None``
+    in *changed_paths* mode.
+
+    Parameters
+    ----------
+    changed_paths:
+        If given, only these config-relative paths are synced instead of
+        walking both trees.  Intended for callers that already track
+        filesystem events; a path that no longer exists in config is removed
+        from the shadow tree.
     """
     shadow_root.mkdir(parents=True, exist_ok=True)
 
-    included_paths: set[str] = set()
-
-    # ---- Copy config → shadow ----
-    for root, dirs, files in os.walk(config_path):
-        rel_root = os.path.relpath(root, config_path)
-        if rel_root == ".":
-            rel_root = ""
-
-        # Prune directories
-        for d in list(dirs):
-            rel_dir = os.path.join(rel_root, d) if rel_root else d
-            if not should_include_path(rel_dir, is_dir=True, shadow_dir_name=shadow_dir_name):
-                dirs.remove(d)
-
-        for filename in files:
-            rel_path = os.path.join(rel_root, filename) if rel_root else filename
-            rel_path_norm = os.path.normpath(rel_path)
-            if not should_include_path(
-                rel_path_norm, is_dir=False, shadow_dir_name=shadow_dir_name
-            ):
-                continue
-
-            src = config_path / rel_path_norm
-            dst = shadow_root / rel_path_norm
-            dst.parent.mkdir(parents=True, exist_ok=True)
+    if changed_paths is not None:
+        _sync_changed_paths(config_path, shadow_root, changed_paths, shadow_dir_name)
+        return None
+
+    # ---- Collect config → shadow copies ----
+    to_copy = [
+        (rel_path, config_path / rel_path, shadow_root / rel_path)
+        for rel_path in _scan_config_files(config_path, shadow_dir_name)
+    ]
+
+    # ---- Copy in parallel, skipping files already current in the shadow tree;
+    # only successful copies count as included ----
+    racy_cutoff_ns = time.time_ns() - RACY_WINDOW_NS
+    with ThreadPoolExecutor(max_workers=_COPY_WORKERS) as pool:
+        copied = pool.map(
+            lambda item: (
+                _shadow_copy_is_current(item[1], item[2], racy_cutoff_ns)
+                or _copy_to_shadow(item[1], item[2])
+            ),
+            to_copy,
+        )
+        included_paths = {item[0] for item, ok in zip(to_copy, copied, strict=True) if ok}
+
+    # ---- Remove obsolete files from shadow ----
+    for rel_path in _walk_shadow_files(shadow_root):
+        if rel_path not in included_paths:
             try:
-                shutil.copy2(src, dst)
-                included_paths.add(rel_path_norm.replace(os.sep, "/"))
+                os.remove(shadow_root / rel_path)
             except Exception as exc:
-                logger.warning("Failed to copy %s to shadow repo: %s", src, exc)
+                logger.warning(
+                    "Failed to remove obsolete file from shadow repo: %s: %s",
+                    rel_path,
+                    exc,
+                )
 
-    # ---- Remove obsolete files from shadow ----
-    for root, dirs, files in os.walk(shadow_root):
-        if ".git" in dirs:
-            dirs.remove(".git")
-        if "export" in dirs:
-            dirs.remove("export")
+    return included_paths
 
-        rel_root = os.path.relpath(root, shadow_root)
-        if rel_root == ".":
-            rel_root = ""
 
-        if rel_root.startswith("export"):
+def _sync_changed_paths(
+    config_path: Path,
+    shadow_root: Path,
+    changed_paths: Iterable[str],
+    shadow_dir_name: str,
+) -> None:
+    """Incremental variant of :func:`sync_config_to_shadow` for known paths."""
+    for rel_path in changed_paths:
+        rel_path_norm = os.path.normpath(rel_path.lstrip("/"))
+        if rel_path_norm.split(os.sep, 1)[0] == ".." or not should_include_path(
+            rel_path_norm, is_dir=False, shadow_dir_name=shadow_dir_name
+        ):
             continue
 
-        for filename in files:
-            rel_path = os.path.join(rel_root, filename) if rel_root else filename
-            rel_path_norm = os.path.normpath(rel_path).replace(os.sep, "/")
-            if rel_path_norm not in included_paths:
-                try:
-                    os.remove(os.path.join(root, filename))
-                except Exception as exc:
-                    logger.warning(
-                        "Failed to remove obsolete file from shadow repo: %s: %s",
-                        rel_path_norm,
-                        exc,
-                    )
+        src = config_path / rel_path_norm
+        dst = shadow_root / rel_path_norm
+        if src.is_file():
+            _copy_to_shadow(src, dst)
+        elif dst.is_file():
+            try:
+                os.remove(dst)
+            except Exception as exc:
+                logger.warning(
+                    "Failed to remove obsolete file from shadow repo: %s: %s",
+                    rel_path_norm,
+                    exc,
+                )
 
 
 def sync_shadow_to_config(
@@ -96,6 +307,7 @@ def sync_shadow_to_config(
     only_paths: list[str] | None = None,
     delete_missing: bool = False,
     shadow_dir_name: str = "cortex_git",
+    config_paths: Iterable[str] | None = None,
 ) -> None:
     """Copy files from *shadow_root* back into *config_path*.
 
@@ -106,79 +318,60 @@ def sync_shadow_to_config(
     delete_missing:
         If ``True``, tracked files present in *config_path* but absent from
         the shadow worktree are deleted.
+    config_paths:
+        Tracked config paths already known to the caller (e.g. the return
+        value of :func:`sync_config_to_shadow`).  Saves re-walking
+        *config_path* when *delete_missing* is set.
     """
 
+    created_dirs: set[Path] = set()
+
     def _copy_single(rel_path: str) -> None:
-        rel_path_norm = os.path.normpath(rel_path)
-        src = shadow_root / rel_path_norm
-        dst = config_path / rel_path_norm
-        if not src.exists():
-            return
-        dst.parent.mkdir(parents=True, exist_ok=True)
+        # *rel_path* is already normalised: walk output or normpath'd input
+        src = shadow_root / rel_path
+        dst = config_path / rel_path
+        if dst.parent not in created_dirs:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(dst.parent)
         try:
-            shutil.copy2(src, dst)
+            _fast_copy(src, dst)
         except Exception as exc:
-            logger.warning("Failed to restore %s to config: %s", rel_path_norm, exc)
+            logger.warning("Failed to restore %s to config: %s", rel_path, exc)
 
+    # One shadow walk serves both the copy and the delete_missing comparison
+    shadow_paths: set[str] = set()
     if only_paths:
         for p in only_paths:
-            _copy_single(p)
-    else:
-        for root, dirs, files in os.walk(shadow_root):
-            if ".git" in dirs:
-                dirs.remove(".git")
-            if "export" in dirs:
-                dirs.remove("export")
-            rel_root = os.path.relpath(root, shadow_root)
-            if rel_root == ".":
-                rel_root = ""
-            if rel_root.startswith("export"):
-                continue
-            for filename in files:
-                rel_path = os.path.join(rel_root, filename) if rel_root else filename
+            rel_path = os.path.normpath(p)
+            if (shadow_root / rel_path).exists():
                 _copy_single(rel_path)
+        if delete_missing:
+            shadow_paths.update(_walk_shadow_files(shadow_root))
+    else:
+        # Paths come straight from the walk: no normalising or existence check
+        for rel_path in _walk_shadow_files(shadow_root):
+            _copy_single(rel_path)
+            shadow_paths.add(rel_path)
+
+    if not delete_missing:
+        return
+
+    if config_paths is None:
+        config_paths = _walk_tracked_config_files(config_path, shadow_dir_name)
+
+    for rel_path in config_paths:
+        if rel_path not in shadow_paths:
+            try:
+                os.remove(config_path / rel_path)
+                logger.info("Removed file from config during rollback: %s", rel_path)
+            except Exception as exc:
+                logger.warning(
+                    "Failed to remove %s from config during rollback: %s",
+                    rel_path,
+                    exc,
+                )
+
 
-    if delete_missing:
-        shadow_paths: set[str] = set()
-        for root, dirs, files in os.walk(shadow_root):
-            if ".git" in dirs:
-                dirs.remove(".git")
-            if "export" in dirs:
-                dirs.remove("export")
-            rel_root = os.path.relpath(root, shadow_root)
-            if rel_root == ".":
-                rel_root = ""
-            if rel_root.startswith("export"):
-                continue
-            for filename in files:
-                rel_path = os.path.join(rel_root, filename) if rel_root else filename
-                shadow_paths.add(os.path.normpath(rel_path).replace(os.sep, "/"))
-
-        config_paths: set[str] = set()
-        for root, dirs, files in os.walk(config_path):
-            for skip_dir in (".git", shadow_dir_name):
-                if skip_dir in dirs:
-                    dirs.remove(skip_dir)
-            rel_root = os.path.relpath(root, config_path)
-            if rel_root == ".":
-                rel_root = ""
-            for filename in files:
-                rel_path = os.path.join(rel_root, filename) if rel_root else filename
-                rel_path_norm = os.path.normpath(rel_path)
-                if not should_include_path(
-                    rel_path_norm, is_dir=False, shadow_dir_name=shadow_dir_name
-                ):
-                    continue
-                config_paths.add(rel_path_norm.replace(os.sep, "/"))
-
-        for rel_path in config_paths:
-            if rel_path not in shadow_paths:
-                try:
-                    os.remove(config_path / rel_path)
-                    logger.info("Removed file from config during rollback: %s", rel_path)
-                except Exception as exc:
-                    logger.warning(
-                        "Failed to remove %s from config during rollback: %s",
-                        rel_path,
-                        exc,
-                    )
+def _walk_tracked_config_files(config_path: Path, shadow_dir_name: str) -> set[str]:
+    """Return forward-slash relative paths of trackable files in *config_path*."""
+    return set(_scan_config_files(config_path, shadow_dir_name))
@@ -13,3 +13,7 @@ class CortexResponse(BaseModel):
     success: bool
     message: str | None = None
     data: Any | None = None
+
+    def to_bytes(self) -> bytes:
+        """Serialize to compact JSON bytes in a single pydantic-core call."""
+        return self.__pydantic_serializer__.to_json(self)
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import sys
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class FilePathResult(BaseModel):
@@ -59,6 +60,13 @@ class YAMLPatchOperation(BaseModel):
     value: Any | None = None
     merge_key: str | None = None
 
+    @field_validator("path")
+    @classmethod
+    def _intern_path(cls, path: list[str | int]) -> list[str | int]:
+        # Batches reuse the same few keys; interned segments let dict lookups
+        # while walking the YAML tree match on identity
+        return [sys.intern(part) if isinstance(part, str) else part for part in path]
+
 
 class YAMLPatchPreview(BaseModel):
     """Preview result for semantic YAML mutations before apply."""
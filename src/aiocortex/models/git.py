@@ -81,6 +81,9 @@ class TransactionOperation(BaseModel):
     op: Literal["write", "delete"]
     path: str
     content: str | None = None
+    # Large write contents are kept in a side file (relative to the
+    # transaction directory) instead of inline
+    content_ref: str | None = None
 
 
 class TransactionRollbackMetadata(BaseModel):
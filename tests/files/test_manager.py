@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import os
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
 from aiocortex.exceptions import FileError, PathSecurityError, YAMLParseError
-from aiocortex.files import AsyncFileManager
+from aiocortex.files import AsyncFileManager, YAMLEditor
 from aiocortex.models import YAMLPatchOperation
 
 # -- Path security -----------------------------------------------------------
@@ -37,6 +40,39 @@ class TestPathSecurity:
         with pytest.raises(PathSecurityError):
             file_manager._get_full_path("subdir/../../..")
 
+    def test_sibling_prefix_blocked(
+        self, file_manager: AsyncFileManager, tmp_config_dir: Path
+    ) -> None:
+        sibling = f"../{tmp_config_dir.name}_other/file.yaml"
+        with pytest.raises(PathSecurityError):
+            file_manager._get_full_path(sibling)
+
+
+class TestExecutor:
+    async def test_custom_executor_used(self, tmp_config_dir: Path) -> None:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            manager = AsyncFileManager(tmp_config_dir, executor=executor)
+            with patch.object(executor, "submit", wraps=executor.submit) as mock_submit:
+                await manager.write_file("new.yaml", "a: 1\n")
+                assert await manager.read_file("new.yaml") == "a: 1\n"
+                await manager.list_files()
+            assert mock_submit.call_count >= 3
+
+    async def test_yaml_work_runs_on_executor(self, tmp_config_dir: Path) -> None:
+        operations = [YAMLPatchOperation(op="set", path=["a"], value=2)]
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            manager = AsyncFileManager(tmp_config_dir, executor=executor)
+            await manager.write_file("patch.yaml", "a: 1\n")
+            with patch.object(executor, "submit", wraps=executor.submit) as mock_submit:
+                await manager.parse_yaml("patch.yaml")
+                parse_calls = mock_submit.call_count
+                await manager.preview_yaml_patch("patch.yaml", operations)
+                preview_calls = mock_submit.call_count - parse_calls
+            funcs = [getattr(call.args[0], "func", None) for call in mock_submit.call_args_list]
+            assert manager._load_yaml_sync in funcs
+            assert YAMLEditor.preview_patch in funcs
+            assert preview_calls >= 2
+
 
 # -- list_files ---------------------------------------------------------------
 
@@ -57,6 +93,11 @@ class TestListFiles:
         files = await file_manager.list_files(pattern="*.yaml")
         assert all(f.is_yaml for f in files)
 
+    async def test_list_nested_with_pattern(self, file_manager: AsyncFileManager) -> None:
+        files = await file_manager.list_files(pattern="dark.*")
+        assert [f.path for f in files] == ["themes/dark.yaml"]
+        assert files[0].is_yaml is True
+
     async def test_list_nonexistent_directory(self, file_manager: AsyncFileManager) -> None:
         files = await file_manager.list_files("nonexistent")
         assert files == []
@@ -72,10 +113,28 @@ class TestListFiles:
 
     async def test_list_generic_exception(self, file_manager: AsyncFileManager) -> None:
         """Generic exceptions in list_files raise FileError."""
-        with patch.object(Path, "rglob", side_effect=OSError("permission denied")):
+        with patch("aiocortex.files.manager.os.scandir", side_effect=OSError("permission denied")):
             with pytest.raises(FileError, match="permission denied"):
                 await file_manager.list_files()
 
+    async def test_list_skips_unreadable_subdirectory(
+        self, file_manager: AsyncFileManager, tmp_config_dir: Path
+    ) -> None:
+        real_scandir = os.scandir
+        blocked = str(tmp_config_dir / "themes")
+
+        def scandir(path: str) -> Iterator[os.DirEntry[str]]:
+            if path == blocked:
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        with patch("aiocortex.files.manager.os.scandir", side_effect=scandir):
+            files = await file_manager.list_files()
+        paths = [f.path for f in files]
+        assert "configuration.yaml" in paths
+        assert "custom_components/test.yaml" in paths
+        assert not any(p.startswith("themes/") for p in paths)
+
     async def test_list_path_security_reraise(self, file_manager: AsyncFileManager) -> None:
         """PathSecurityError re-raised from list_files."""
         with pytest.raises(PathSecurityError):
@@ -151,6 +210,14 @@ class TestAppendFile:
         content = await file_manager.read_file("scripts.yaml")
         assert "script_1:" in content
 
+    async def test_append_separates_with_newline(
+        self, file_manager: AsyncFileManager, tmp_config_dir: Path
+    ) -> None:
+        result = await file_manager.append_file("configuration.yaml", "logger:\n")
+        expected = "homeassistant:\n  name: Test Home\n\nlogger:\n"
+        assert (tmp_config_dir / "configuration.yaml").read_text() == expected
+        assert result.total_size == len(expected)
+
     async def test_append_creates_file(
         self, file_manager: AsyncFileManager, tmp_config_dir: Path
     ) -> None:
@@ -158,6 +225,23 @@ class TestAppendFile:
         assert result.success is True
         assert (tmp_config_dir / "brand_new.yaml").exists()
 
+    async def test_append_creates_nested_file(
+        self, file_manager: AsyncFileManager, tmp_config_dir: Path
+    ) -> None:
+        result = await file_manager.append_file("packages/new.yaml", "a: 1\n")
+        assert (tmp_config_dir / "packages" / "new.yaml").read_text() == "a: 1\n"
+        assert result.total_size == 5
+
+    async def test_append_non_ascii_sizes_in_bytes(
+        self, file_manager: AsyncFileManager, tmp_config_dir: Path
+    ) -> None:
+        await file_manager.append_file("notes.yaml", "name: Café\n")
+        result = await file_manager.append_file("notes.yaml", "icon: ☕\n")
+        raw = (tmp_config_dir / "notes.yaml").read_bytes()
+        assert raw == "name: Café\n\nicon: ☕\n".encode()
+        assert result.added_bytes == len("icon: ☕\n".encode()) == 10
+        assert result.total_size == len(raw)
+
     async def test_append_path_security_reraise(self, file_manager: AsyncFileManager) -> None:
         with pytest.raises(PathSecurityError):
             await file_manager.append_file("../../bad.yaml", "data\n")
@@ -205,6 +289,22 @@ class TestParseYaml:
         data = await file_manager.parse_yaml("scripts.yaml")
         assert data == {}
 
+    async def test_parse_cached_until_write(self, file_manager: AsyncFileManager) -> None:
+        first = await file_manager.parse_yaml("configuration.yaml")
+        first["homeassistant"]["name"] = "Mutated"
+        with patch("aiocortex.files.manager.yaml.load") as mock_load:
+            second = await file_manager.parse_yaml("configuration.yaml")
+            mock_load.assert_not_called()
+        assert second["homeassistant"]["name"] == "Test Home"
+
+        await file_manager.write_file("configuration.yaml", "homeassistant:\n  name: New\n")
+        third = await file_manager.parse_yaml("configuration.yaml")
+        assert third["homeassistant"]["name"] == "New"
+
+    async def test_parse_not_found(self, file_manager: AsyncFileManager) -> None:
+        with pytest.raises(FileNotFoundError):
+            await file_manager.parse_yaml("missing.yaml")
+
     async def test_parse_invalid(self, file_manager: AsyncFileManager) -> None:
         await file_manager.write_file("bad.yaml", ":\n  - :\n    bad: [")
         with pytest.raises(YAMLParseError):
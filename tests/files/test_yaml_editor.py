@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+from unittest.mock import patch
+
+import yaml
+
 from aiocortex.files import YAMLEditor
+from aiocortex.files.yaml_editor import _empty_section_pattern, _parse_cached
 from aiocortex.models import YAMLPatchOperation
 
 
@@ -23,6 +28,14 @@ class TestRemoveLinesFromEnd:
         assert "line2" in result
         assert "line3" not in result
 
+    def test_trailing_blank_lines_ignored(self) -> None:
+        content = "line1\nline2\nline3\n\n\n"
+        assert YAMLEditor.remove_lines_from_end(content, 1) == "line1\nline2\n"
+        assert YAMLEditor.remove_lines_from_end(content, 3) == ""
+
+    def test_remove_zero(self) -> None:
+        assert YAMLEditor.remove_lines_from_end("line1\nline2\n", 0) == "line1\nline2\n"
+
 
 class TestRemoveEmptyYamlSection:
     def test_remove_with_comment(self) -> None:
@@ -41,6 +54,16 @@ class TestRemoveEmptyYamlSection:
         result = YAMLEditor.remove_empty_yaml_section(content, "lovelace")
         assert result == content
 
+    def test_section_name_is_literal(self) -> None:
+        content = "a: 1\nxlovelace:\n  dashboards:\nb: 2\n"
+        assert YAMLEditor.remove_empty_yaml_section(content, ".lovelace") == content
+
+    def test_patterns_built_once_per_section(self) -> None:
+        YAMLEditor.remove_empty_yaml_section("a: 1\n", "pattern_cache_section")
+        hits = _empty_section_pattern.cache_info().hits
+        YAMLEditor.remove_empty_yaml_section("b: 2\n", "pattern_cache_section")
+        assert _empty_section_pattern.cache_info().hits == hits + 1
+
 
 class TestRemoveYamlEntry:
     def test_remove_existing(self) -> None:
@@ -57,12 +80,42 @@ class TestRemoveYamlEntry:
         assert "ai-dashboard:" not in modified
         assert "next: true" in modified
 
+    def test_remove_only_matching_entry(self) -> None:
+        content = (
+            "lovelace:\n"
+            "  dashboards:\n"
+            "    first:\n"
+            "      mode: yaml\n"
+            "    ai-dashboard:\n"
+            "\n"
+            "      mode: yaml\n"
+            "      title: AI\n"
+            "    ai-dashboard-two:\n"
+            "      mode: storage\n"
+        )
+        modified, found = YAMLEditor.remove_yaml_entry(content, "lovelace", "ai-dashboard")
+        assert found is True
+        assert modified == (
+            "lovelace:\n"
+            "  dashboards:\n"
+            "    first:\n"
+            "      mode: yaml\n"
+            "    ai-dashboard-two:\n"
+            "      mode: storage\n"
+        )
+
     def test_remove_nonexistent(self) -> None:
         content = "lovelace:\n  dashboards:\n    real:\n      mode: yaml\n"
         modified, found = YAMLEditor.remove_yaml_entry(content, "lovelace", "fake")
         assert found is False
         assert modified == content
 
+    def test_remove_key_only_as_substring(self) -> None:
+        content = "lovelace:\n  dashboards:\n    other:\n      title: '    real:'\n"
+        modified, found = YAMLEditor.remove_yaml_entry(content, "lovelace", "real")
+        assert found is False
+        assert modified == content
+
 
 class TestSemanticPatch:
     def test_preview_set_operation(self) -> None:
@@ -105,8 +158,157 @@ class TestSemanticPatch:
         )
         assert preview.success is False
         assert len(preview.conflicts) == 1
+        assert preview.patched_content == content
+        assert preview.diff == ""
+
+    def test_apply_without_diff(self) -> None:
+        operations = [YAMLPatchOperation(op="set", path=["a"], value=2)]
+        with patch("aiocortex.files.yaml_editor.difflib.unified_diff") as mock_diff:
+            applied = YAMLEditor.apply_patch("a: 1\n", operations, include_diff=False)
+        mock_diff.assert_not_called()
+        assert applied.patched_content == "a: 2\n"
+        assert applied.diff == ""
+        assert YAMLEditor.apply_patch("a: 1\n", operations).diff
+
+    def test_merge_without_key_conflicts(self) -> None:
+        preview = YAMLEditor.preview_patch(
+            "automation:\n- id: a\n",
+            [YAMLPatchOperation(op="merge_item", path=["automation"], value={"id": "a"})],
+        )
+        assert preview.success is False
+        assert preview.conflicts[0].reason == "Could not apply operation 'merge_item'"
+
+    def test_preview_then_apply_parses_once(self) -> None:
+        content = "homeassistant:\n  name: Parse Once\n"
+        operations = [YAMLPatchOperation(op="set", path=["homeassistant", "name"], value="X")]
+        with patch("aiocortex.files.yaml_editor.yaml.load", wraps=yaml.load) as mock_load:
+            YAMLEditor.preview_patch(content, operations)
+            applied = YAMLEditor.apply_patch(content, operations)
+            again = YAMLEditor.preview_patch(content, [])
+        assert mock_load.call_count == 1
+        assert "name: X" in applied.patched_content
+        # The cached tree must not be mutated by earlier operations
+        assert "Parse Once" in again.patched_content
+
+    def test_operations_leave_cached_tree_untouched(self) -> None:
+        content = (
+            "automation:\n- id: a\n  alias: A\n- id: b\n  alias: B\n"
+            "homeassistant:\n  name: Untouched\n  unit_system: metric\n"
+            "script:\n  s1:\n    alias: S1\n"
+        )
+        before = yaml.safe_dump(_parse_cached(content))
+        preview = YAMLEditor.preview_patch(
+            content,
+            [
+                YAMLPatchOperation(op="set", path=["homeassistant", "name"], value="New"),
+                YAMLPatchOperation(op="remove", path=["homeassistant", "unit_system"]),
+                YAMLPatchOperation(op="set", path=["automation", 0, "alias"], value="A2"),
+                YAMLPatchOperation(
+                    op="merge_item", path=["automation"], merge_key="id", value={"id": "c"}
+                ),
+            ],
+        )
+        assert preview.success is True
+        assert preview.operations_applied == 4
+        patched = yaml.safe_load(preview.patched_content)
+        assert patched["homeassistant"] == {"name": "New"}
+        assert [item["id"] for item in patched["automation"]] == ["a", "b", "c"]
+        assert patched["automation"][0]["alias"] == "A2"
+        assert yaml.safe_dump(_parse_cached(content)) == before
+
+    def test_sibling_operations_share_parent_walk(self) -> None:
+        content = "automation:\n- id: a\n  action: []\n- id: b\n"
+        operations = [
+            YAMLPatchOperation(op="set", path=["automation", 0, "alias"], value="A"),
+            YAMLPatchOperation(op="set", path=["automation", 0, "mode"], value="single"),
+            YAMLPatchOperation(
+                op="merge_item", path=["automation"], merge_key="id", value={"id": "a"}
+            ),
+            YAMLPatchOperation(op="remove", path=["automation", 0, "action"]),
+        ]
+        with patch.object(
+            YAMLEditor, "_writable_child", wraps=YAMLEditor._writable_child
+        ) as mock_child:
+            preview = YAMLEditor.preview_patch(content, operations)
+        # One walk for the first set (reused by the second), one for the merge,
+        # and a fresh walk for the remove since a merge can replace subtrees
+        assert mock_child.call_count == 6
+        assert preview.success is True
+        patched = yaml.safe_load(preview.patched_content)
+        assert patched["automation"][0] == {"id": "a", "alias": "A", "mode": "single"}
+
+    def test_set_after_merge_writes_into_merged_subtree(self) -> None:
+        content = "a:\n- name: one\n  x:\n    k: 1\n"
+        operations = [
+            YAMLPatchOperation(op="set", path=["a", 0, "x", "k"], value=2),
+            YAMLPatchOperation(
+                op="merge_item",
+                path=["a"],
+                merge_key="name",
+                value={"name": "one", "x": {"k": 10}},
+            ),
+            YAMLPatchOperation(op="set", path=["a", 0, "x", "z"], value=3),
+        ]
+        preview = YAMLEditor.preview_patch(content, operations)
+        assert preview.operations_applied == 3
+        assert yaml.safe_load(preview.patched_content) == {
+            "a": [{"name": "one", "x": {"k": 10, "z": 3}}]
+        }
+        # The operation value itself is left untouched
+        assert operations[1].value == {"name": "one", "x": {"k": 10}}
+
+    def test_repeated_merges_copy_item_once(self) -> None:
+        content = "automation:\n- id: a\n  alias: A\n"
+        cached_item = _parse_cached(content)["automation"][0]
+        preview = YAMLEditor.preview_patch(
+            content,
+            [
+                YAMLPatchOperation(
+                    op="merge_item", path=["automation"], merge_key="id", value=value
+                )
+                for value in ({"id": "a", "alias": "B"}, {"id": "a", "mode": "queued"})
+            ],
+        )
+        assert preview.success is True
+        patched = yaml.safe_load(preview.patched_content)
+        assert patched["automation"] == [{"id": "a", "alias": "B", "mode": "queued"}]
+        assert cached_item == {"id": "a", "alias": "A"}
+
+    def test_set_value_not_mutated_by_later_operations(self) -> None:
+        value = {"alias": "Original"}
+        YAMLEditor.preview_patch(
+            "script: {}\n",
+            [
+                YAMLPatchOperation(op="set", path=["script", "s1"], value=value),
+                YAMLPatchOperation(op="set", path=["script", "s1", "alias"], value="Changed"),
+            ],
+        )
+        assert value == {"alias": "Original"}
+
+    def test_round_trip_matches_pure_python(self) -> None:
+        content = "b:\n  - 1\n  - two\na: {nested: true, name: Café}\n"
+        preview = YAMLEditor.preview_patch(content, [])
+        expected = yaml.safe_dump(yaml.safe_load(content), sort_keys=True, allow_unicode=True)
+        assert preview.patched_content == expected
 
     def test_normalized_diff(self) -> None:
         diff = YAMLEditor.normalized_diff("a: 1\n", "a: 2\n")
         assert "before.yaml" in diff
         assert "after.yaml" in diff
+
+    def test_normalized_diff_lines(self) -> None:
+        lines = list(YAMLEditor.normalized_diff_lines("a: 1\nb: 2\n", "a: 1\nb: 3\n"))
+        assert lines[:2] == ["--- before.yaml", "+++ after.yaml"]
+        assert "-b: 2" in lines
+        assert "+b: 3" in lines
+        assert "\n".join(lines) == YAMLEditor.normalized_diff("a: 1\nb: 2\n", "a: 1\nb: 3\n")
+
+    def test_normalized_diff_identical(self) -> None:
+        with patch("aiocortex.files.yaml_editor.difflib.unified_diff") as mock_diff:
+            assert YAMLEditor.normalized_diff("a: 1\n", "a: 1\n\n") == ""
+        mock_diff.assert_not_called()
+
+    def test_preview_unchanged_has_empty_diff(self) -> None:
+        preview = YAMLEditor.preview_patch("a: 1\nb: 2\n", [])
+        assert preview.patched_content == "a: 1\nb: 2\n"
+        assert preview.diff == ""
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import subprocess
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import patch
 
@@ -11,8 +12,9 @@ import pytest
 from aiocortex.exceptions import GitError
 from aiocortex.git.cleanup import (
     _git_binary_available,
-    _truncate_via_clone,
     _truncate_via_dulwich,
+    _truncate_via_shallow_fetch,
+    async_truncate_history,
     truncate_history,
 )
 from aiocortex.git.manager import GitManager
@@ -67,6 +69,12 @@ class TestManualCleanup:
 
 
 class TestGitBinaryAvailable:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self) -> Iterator[None]:
+        _git_binary_available.cache_clear()
+        yield
+        _git_binary_available.cache_clear()
+
     def test_not_found(self) -> None:
         with patch("aiocortex.git.cleanup.subprocess.run", side_effect=FileNotFoundError):
             assert _git_binary_available() is False
@@ -78,6 +86,13 @@ class TestGitBinaryAvailable:
         ):
             assert _git_binary_available() is False
 
+    def test_result_is_cached(self) -> None:
+        ok = subprocess.CompletedProcess(["git", "--version"], 0, b"", b"")
+        with patch("aiocortex.git.cleanup.subprocess.run", return_value=ok) as mock_run:
+            assert _git_binary_available() is True
+            assert _git_binary_available() is True
+        mock_run.assert_called_once()
+
 
 class TestTruncateHistory:
     def test_no_git_dir_raises(self, tmp_path: Path) -> None:
@@ -94,67 +109,50 @@ class TestTruncateHistory:
                 assert result == 5
 
 
-class TestTruncateViaClone:
+class TestAsyncTruncateHistory:
+    async def test_delegates_to_truncate_history(self, tmp_path: Path) -> None:
+        with patch("aiocortex.git.cleanup.truncate_history", return_value=3) as mock_truncate:
+            assert await async_truncate_history(tmp_path, 3) == 3
+        mock_truncate.assert_called_once_with(tmp_path, 3)
+
+    async def test_no_git_dir_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(GitError, match=r"No \.git directory"):
+            await async_truncate_history(tmp_path, 5)
+
+
+class TestTruncateViaShallowFetch:
     def test_branch_detection_failure(self, tmp_path: Path) -> None:
         """Falls back to 'master' when branch detection fails."""
-        (tmp_path / ".git").mkdir()
         calls = []
 
         def fake_run(cmd, **kwargs):
             calls.append(cmd)
             if "branch" in cmd:
                 raise OSError("branch detection failed")
-            # Clone command — simulate failure
-            result = subprocess.CompletedProcess(cmd, 1, "", "clone failed")
-            return result
+            # Fetch command — simulate failure
+            return subprocess.CompletedProcess(cmd, 1, "", "fetch failed")
 
         with patch("aiocortex.git.cleanup.subprocess.run", side_effect=fake_run):
-            with pytest.raises(GitError, match="git clone failed"):
-                _truncate_via_clone(tmp_path, 5)
-
-    def test_clone_failure_raises(self, tmp_path: Path) -> None:
-        (tmp_path / ".git").mkdir()
+            with pytest.raises(GitError, match="git fetch failed"):
+                _truncate_via_shallow_fetch(tmp_path, 5)
+        assert calls[-1][-1] == "master:master"
 
+    def test_fetch_failure_raises(self, tmp_path: Path) -> None:
         def fake_run(cmd, **kwargs):
             if "branch" in cmd:
                 return subprocess.CompletedProcess(cmd, 0, "main\n", "")
-            # Clone command fails
             return subprocess.CompletedProcess(cmd, 1, "", "fatal: error")
 
         with patch("aiocortex.git.cleanup.subprocess.run", side_effect=fake_run):
-            with pytest.raises(GitError, match="git clone failed"):
-                _truncate_via_clone(tmp_path, 5)
-
-    def test_cloned_git_dir_missing_raises(self, tmp_path: Path) -> None:
-        (tmp_path / ".git").mkdir()
-
-        def fake_run(cmd, **kwargs):
-            if "branch" in cmd:
-                return subprocess.CompletedProcess(cmd, 0, "main\n", "")
-            if "clone" in cmd:
-                # Clone succeeds but doesn't create .git
-                clone_dest = cmd[-1]
-                Path(clone_dest).mkdir(parents=True, exist_ok=True)
-                return subprocess.CompletedProcess(cmd, 0, "", "")
-            return subprocess.CompletedProcess(cmd, 0, "", "")
-
-        with patch("aiocortex.git.cleanup.subprocess.run", side_effect=fake_run):
-            with pytest.raises(GitError, match=r"Cloned \.git directory"):
-                _truncate_via_clone(tmp_path, 5)
+            with pytest.raises(GitError, match="git fetch failed"):
+                _truncate_via_shallow_fetch(tmp_path, 5)
 
     def test_gc_failure_is_non_fatal(self, tmp_path: Path) -> None:
         """git gc failure after truncation is logged but not raised."""
-        (tmp_path / ".git").mkdir()
 
         def fake_run(cmd, **kwargs):
             if "branch" in cmd:
                 return subprocess.CompletedProcess(cmd, 0, "main\n", "")
-            if "clone" in cmd:
-                clone_dest = cmd[-1]
-                clone_path = Path(clone_dest)
-                clone_path.mkdir(parents=True, exist_ok=True)
-                (clone_path / ".git").mkdir()
-                return subprocess.CompletedProcess(cmd, 0, "", "")
             if "gc" in cmd:
                 raise OSError("gc failed")
             if "rev-list" in cmd:
@@ -162,38 +160,46 @@ class TestTruncateViaClone:
             return subprocess.CompletedProcess(cmd, 0, "", "")
 
         with patch("aiocortex.git.cleanup.subprocess.run", side_effect=fake_run):
-            with patch("aiocortex.git.cleanup.shutil.copytree"):
-                with patch("aiocortex.git.cleanup.shutil.rmtree"):
-                    result = _truncate_via_clone(tmp_path, 5)
-                    assert result == 5
+            assert _truncate_via_shallow_fetch(tmp_path, 5) == 5
 
     def test_rev_list_failure_returns_default(self, tmp_path: Path) -> None:
         """When rev-list count fails, return commits_to_keep as default."""
-        (tmp_path / ".git").mkdir()
-        call_count = 0
 
         def fake_run(cmd, **kwargs):
-            nonlocal call_count
-            call_count += 1
             if "branch" in cmd:
                 return subprocess.CompletedProcess(cmd, 0, "main\n", "")
-            if "clone" in cmd:
-                clone_dest = cmd[-1]
-                clone_path = Path(clone_dest)
-                clone_path.mkdir(parents=True, exist_ok=True)
-                (clone_path / ".git").mkdir()
-                return subprocess.CompletedProcess(cmd, 0, "", "")
-            if "gc" in cmd:
-                return subprocess.CompletedProcess(cmd, 0, "", "")
             if "rev-list" in cmd:
                 raise OSError("rev-list failed")
             return subprocess.CompletedProcess(cmd, 0, "", "")
 
         with patch("aiocortex.git.cleanup.subprocess.run", side_effect=fake_run):
-            with patch("aiocortex.git.cleanup.shutil.copytree"):
-                with patch("aiocortex.git.cleanup.shutil.rmtree"):
-                    result = _truncate_via_clone(tmp_path, 5)
-                    assert result == 5
+            assert _truncate_via_shallow_fetch(tmp_path, 5) == 5
+
+    @pytest.mark.skipif(not _git_binary_available(), reason="git binary not available")
+    def test_truncates_in_place_and_drops_stale_tags(self, tmp_path: Path) -> None:
+        from dulwich import porcelain
+        from dulwich.repo import Repo
+
+        Repo.init(str(tmp_path))
+        for i in range(6):
+            (tmp_path / "file.txt").write_text(f"version {i}\n")
+            porcelain.add(str(tmp_path))
+            porcelain.commit(
+                str(tmp_path),
+                message=f"Commit {i}".encode(),
+                author=b"Test <t@t>",
+                committer=b"Test <t@t>",
+            )
+            if i in (0, 5):
+                porcelain.tag_create(
+                    str(tmp_path), f"tag_{i}".encode(), message=b"t", author=b"Test <t@t>"
+                )
+
+        assert _truncate_via_shallow_fetch(tmp_path, 3) == 3
+        repo = Repo(str(tmp_path))
+        assert b"refs/tags/tag_5" in repo.refs.keys()
+        assert b"refs/tags/tag_0" not in repo.refs.keys()
+        assert len(list(repo.get_walker())) == 3
 
 
 class TestTruncateViaDulwich:
@@ -249,3 +255,21 @@ class TestTruncateViaDulwich:
 
         result = _truncate_via_dulwich(tmp_path, 3)
         assert result == 3
+
+        repo = Repo(str(tmp_path))
+        messages = [entry.commit.message for entry in repo.get_walker()]
+        assert messages == [b"Commit 4", b"Commit 3", b"Commit 2"]
+        assert not any(repo.object_store._iter_loose_objects())
+
+    def test_repack_failure_is_non_fatal(self, tmp_path: Path) -> None:
+        from dulwich.porcelain import add, commit
+        from dulwich.repo import Repo
+
+        Repo.init(str(tmp_path))
+        for i in range(3):
+            (tmp_path / "file.txt").write_text(f"version {i}\n")
+            add(str(tmp_path))
+            commit(str(tmp_path), message=f"Commit {i}".encode(), author=b"Test <t@t>")
+
+        with patch("aiocortex.git.cleanup.porcelain.repack", side_effect=OSError("disk")):
+            assert _truncate_via_dulwich(tmp_path, 2) == 2
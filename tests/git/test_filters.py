@@ -71,3 +71,12 @@ class TestFileFiltering:
     def test_nested_yaml_included(self) -> None:
         assert should_include_path("custom_components/test/manifest.json", is_dir=False) is True
         assert should_include_path("esphome/device.yaml", is_dir=False) is True
+
+    def test_nested_excluded_patterns(self) -> None:
+        assert should_include_path("esphome/.esphome/build.log", is_dir=False) is False
+        assert should_include_path("backups/home-assistant_v2.db.1", is_dir=False) is False
+        assert should_include_path("packages/lights.yaml.old", is_dir=False) is False
+
+    def test_top_level_file_named_like_excluded_dir(self) -> None:
+        assert should_include_path("www", is_dir=False) is True
+        assert should_include_path("node_modules/pkg/index.js", is_dir=False) is False
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from dulwich.index import Index
+from dulwich.object_store import iter_tree_contents
+from dulwich.objects import Blob
 
 from aiocortex.exceptions import GitError, GitNotInitializedError
+from aiocortex.git.cleanup import _git_binary_available
 from aiocortex.git.manager import GitManager
 
 
@@ -29,6 +38,20 @@ async def git_manager(config_dir: Path) -> GitManager:
     return mgr
 
 
+def _backdate_tree(root: Path) -> None:
+    """Move every mtime under *root* a minute into the past."""
+    past_ns = time.time_ns() - 60 * 10**9
+    for path in [root, *root.rglob("*")]:
+        os.utime(path, ns=(past_ns, past_ns))
+
+
+def _restore_with_older_mtime(path: Path, content: str) -> None:
+    """Rewrite *path* in place with an mtime older than every other file's."""
+    old_ns = time.time_ns() - 120 * 10**9
+    path.write_text(content)
+    os.utime(path, ns=(old_ns, old_ns))
+
+
 class TestInitRepo:
     async def test_creates_shadow_dir(self, config_dir: Path) -> None:
         mgr = GitManager(config_dir)
@@ -51,6 +74,53 @@ class TestInitRepo:
         assert mgr._repo is None
 
 
+class TestExecutor:
+    async def test_custom_executor_used(self, config_dir: Path) -> None:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            mgr = GitManager(config_dir, executor=executor)
+            with patch.object(executor, "submit", wraps=executor.submit) as mock_submit:
+                await mgr.init_repo()
+                assert await mgr.commit_changes("Initial") is not None
+                assert len(await mgr.get_history()) == 1
+            assert mock_submit.call_count == 3
+
+    async def test_jobs_of_one_manager_never_overlap(self, config_dir: Path) -> None:
+        active = 0
+        overlap = 0
+        lock = threading.Lock()
+
+        def job() -> None:
+            nonlocal active, overlap
+            with lock:
+                active += 1
+                overlap = max(overlap, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            mgr = GitManager(config_dir, executor=executor)
+            await asyncio.gather(*(mgr._run_blocking(job) for _ in range(4)))
+        assert overlap == 1
+
+    async def test_cancelled_caller_keeps_lock_until_job_ends(self, config_dir: Path) -> None:
+        started = threading.Event()
+        release = threading.Event()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            mgr = GitManager(config_dir, executor=executor)
+            task = asyncio.ensure_future(
+                mgr._run_blocking(lambda: (started.set(), release.wait(5)))
+            )
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            assert mgr._git_lock.locked()
+            release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert not mgr._git_lock.locked()
+
+
 class TestRepoProperty:
     def test_raises_when_not_initialized(self, config_dir: Path) -> None:
         mgr = GitManager(config_dir)
@@ -65,6 +135,107 @@ class TestCommitCount:
         await mgr.init_repo()
         assert mgr._commit_count() == 0
 
+    async def test_count_is_memoized_per_head(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        for i in range(3):
+            (config_dir / "configuration.yaml").write_text(f"version: {i}\n")
+            await git_manager.commit_changes(f"Commit {i}")
+
+        head = git_manager.repo.head()
+        assert git_manager._commit_count_cache == (head, 3)
+        with patch.object(git_manager.repo, "get_object") as mock_get:
+            assert git_manager._commit_count() == 3
+        mock_get.assert_not_called()
+
+    async def test_limited_count_stops_early(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        for i in range(4):
+            (config_dir / "configuration.yaml").write_text(f"version: {i}\n")
+            await git_manager.commit_changes(f"Commit {i}")
+
+        git_manager._commit_count_cache = None
+        with patch.object(
+            git_manager.repo, "get_object", wraps=git_manager.repo.get_object
+        ) as mock_get:
+            assert git_manager._commit_count(limit=2) == 2
+        assert mock_get.call_count == 1
+        assert git_manager._commit_count_cache is None
+        assert git_manager._commit_count() == 4
+
+    @pytest.mark.skipif(not _git_binary_available(), reason="git binary not available")
+    async def test_count_after_shallow_cleanup(self, config_dir: Path) -> None:
+        mgr = GitManager(config_dir, max_backups=3)
+        await mgr.init_repo()
+        mgr.max_backups = 100
+        for i in range(6):
+            (config_dir / "configuration.yaml").write_text(f"version: {i}\n")
+            await mgr.commit_changes(f"Commit {i}")
+        mgr.max_backups = 3
+
+        result = await mgr.cleanup_commits()
+        assert result.commits_after == 3
+        assert mgr._commit_count_cache == (mgr.repo.head(), 3)
+        # A fresh walk stops at the shallow boundary instead of failing
+        mgr._commit_count_cache = None
+        assert mgr._commit_count() == 3
+
+    async def test_rollback_invalidates_count(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        sha1 = await git_manager.commit_changes("First")
+        (config_dir / "configuration.yaml").write_text("version: 2\n")
+        await git_manager.commit_changes("Second")
+
+        await git_manager.rollback(sha1)
+        assert git_manager._commit_count_cache is None
+        assert git_manager._commit_count() == 1
+
+
+class TestResolveCommitSha:
+    async def test_expands_short_hash(self, git_manager: GitManager) -> None:
+        short = await git_manager.commit_changes("First")
+        assert short is not None
+        assert git_manager._resolve_commit_sha(short) == git_manager.repo.head()
+
+    async def test_expands_packed_short_hash(self, git_manager: GitManager) -> None:
+        from dulwich import porcelain
+
+        short = await git_manager.commit_changes("First")
+        assert short is not None
+        porcelain.repack(str(git_manager.shadow_root))
+        git_manager._repo = None
+        await git_manager.init_repo()
+        assert git_manager._resolve_commit_sha(short) == git_manager.repo.head()
+
+    async def test_unresolvable_returned_unchanged(self, git_manager: GitManager) -> None:
+        await git_manager.commit_changes("First")
+        assert git_manager._resolve_commit_sha("not-hex") == b"not-hex"
+        assert git_manager._resolve_commit_sha("0000000") == b"0000000"
+
+
+class TestDirtyState:
+    async def test_clean_after_commit(self, git_manager: GitManager) -> None:
+        await git_manager.commit_changes("Initial")
+        assert git_manager._dirty_state() == (False, [])
+
+    async def test_worktree_changes_skip_index_comparison(self, git_manager: GitManager) -> None:
+        await git_manager.commit_changes("Initial")
+        (git_manager.shadow_root / "new.yaml").write_text("a: 1\n")
+        (git_manager.shadow_root / "configuration.yaml").write_text("b: 2\n")
+        with patch.object(Index, "changes_from_tree") as mock_changes:
+            dirty, to_stage = git_manager._dirty_state()
+        mock_changes.assert_not_called()
+        assert dirty is True
+        assert sorted(to_stage) == ["configuration.yaml", "new.yaml"]
+
+    async def test_staged_only_change_is_dirty(self, git_manager: GitManager) -> None:
+        await git_manager.commit_changes("Initial")
+        (git_manager.shadow_root / "new.yaml").write_text("a: 1\n")
+        git_manager.repo.get_worktree().stage(["new.yaml"])
+        assert git_manager._dirty_state() == (True, [])
+
 
 class TestCommitChanges:
     async def test_first_commit(self, git_manager: GitManager) -> None:
@@ -72,11 +243,50 @@ class TestCommitChanges:
         assert sha is not None
         assert len(sha) == 8
 
+    async def test_commit_metadata(self, git_manager: GitManager) -> None:
+        await git_manager.commit_changes("Initial commit")
+        commit = git_manager.repo[git_manager.repo.head()]
+        assert commit.message == b"Initial commit"
+        assert commit.author == commit.committer == b"Cortex <cortex@homeassistant.local>"
+        assert commit.parents == []
+
     async def test_no_changes_returns_none(self, git_manager: GitManager) -> None:
         await git_manager.commit_changes("First")
         sha = await git_manager.commit_changes("Second — no changes")
         assert sha is None
 
+    async def test_unchanged_config_skips_sync(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        """Once clean with settled mtimes, an unchanged config skips sync entirely."""
+        _backdate_tree(config_dir)
+
+        assert await git_manager.commit_changes("First") is not None
+        with patch("aiocortex.git.manager.sync_config_to_shadow") as mock_sync:
+            assert await git_manager.commit_changes("Unchanged") is None
+        mock_sync.assert_not_called()
+
+        (config_dir / "automations.yaml").write_text("- id: a2\n")
+        assert await git_manager.commit_changes("Changed") is not None
+
+    async def test_edit_with_older_mtime_is_committed(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        """An edit carrying an old mtime (cp -p, touch -r) is still committed."""
+        _backdate_tree(config_dir)
+        assert await git_manager.commit_changes("First") is not None
+        assert git_manager._clean_signature is not None
+
+        _restore_with_older_mtime(config_dir / "configuration.yaml", "name: Restored\n")
+        assert await git_manager.commit_changes("Restored") is not None
+        assert (git_manager.shadow_root / "configuration.yaml").read_text() == "name: Restored\n"
+
+    async def test_recent_mtimes_never_skip_sync(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        await git_manager.commit_changes("First")
+        assert git_manager._clean_signature is None
+
     async def test_skip_if_processing(self, git_manager: GitManager) -> None:
         git_manager.processing_request = True
         sha = await git_manager.commit_changes("Should skip", skip_if_processing=True)
@@ -101,6 +311,23 @@ class TestCommitChanges:
         sha = await git_manager.commit_changes("Added new file")
         assert sha is not None
 
+    async def test_stages_additions_and_deletions(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        await git_manager.commit_changes("First")
+        (config_dir / "automations.yaml").unlink()
+        pkg = config_dir / "packages" / "lights"
+        pkg.mkdir(parents=True)
+        (pkg / "kitchen.yaml").write_text("light: []\n")
+
+        assert await git_manager.commit_changes("Second") is not None
+        repo = git_manager.repo
+        tree = repo[repo[repo.head()].tree]
+        paths = {entry.path for entry in iter_tree_contents(repo.object_store, tree.id)}
+        assert b"packages/lights/kitchen.yaml" in paths
+        assert b"automations.yaml" not in paths
+        assert await git_manager.commit_changes("Nothing new") is None
+
     async def test_repo_none_returns_none(self, config_dir: Path) -> None:
         """commit_changes returns None when _repo is None."""
         mgr = GitManager(config_dir)
@@ -164,6 +391,18 @@ class TestGetHistory:
         assert history[0].message == "Second commit"
         assert history[1].message == "First commit"
 
+    async def test_files_changed_counts_paths(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        await git_manager.commit_changes("First commit")
+        (config_dir / "new.yaml").write_text("x: 1\n")
+        (config_dir / "automations.yaml").write_text("[]\n")
+        await git_manager.commit_changes("Second commit")
+
+        history = await git_manager.get_history(limit=1)
+        assert history[0].files_changed == 2
+        assert len(history[0].hash) == 8
+
     async def test_limit(self, git_manager: GitManager, config_dir: Path) -> None:
         await git_manager.commit_changes("C1")
         (config_dir / "a.yaml").write_text("a\n")
@@ -193,6 +432,55 @@ class TestGetPendingChanges:
         pending = await git_manager.get_pending_changes()
         assert pending.has_changes is False
 
+    async def test_unchanged_config_skips_sync(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        _backdate_tree(config_dir)
+        await git_manager.commit_changes("Initial")
+        with patch("aiocortex.git.manager.sync_config_to_shadow") as mock_sync:
+            pending = await git_manager.get_pending_changes()
+        mock_sync.assert_not_called()
+        assert pending.has_changes is False
+
+        (config_dir / "brand_new.yaml").write_text("data: true\n")
+        pending = await git_manager.get_pending_changes()
+        assert pending.files_added == ["brand_new.yaml"]
+
+    async def test_edit_with_older_mtime_is_reported(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        _backdate_tree(config_dir)
+        await git_manager.commit_changes("Initial")
+        assert (await git_manager.get_pending_changes()).has_changes is False
+
+        # A cached dirty result must not hide the later backdated edit either
+        (config_dir / "added.yaml").write_text("a: 1\n")
+        _backdate_tree(config_dir)
+        assert (await git_manager.get_pending_changes()).files_added == ["added.yaml"]
+
+        _restore_with_older_mtime(config_dir / "configuration.yaml", "name: Restored\n")
+        pending = await git_manager.get_pending_changes()
+        assert pending.has_changes is True
+        assert pending.files_modified == ["configuration.yaml"]
+        assert "+name: Restored" in pending.diff
+
+    async def test_unchanged_dirty_state_reuses_scan(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        await git_manager.commit_changes("Initial")
+        (config_dir / "brand_new.yaml").write_text("data: true\n")
+        _backdate_tree(config_dir)
+        first = await git_manager.get_pending_changes()
+        with patch("aiocortex.git.manager.sync_config_to_shadow") as mock_sync:
+            second = await git_manager.get_pending_changes()
+        mock_sync.assert_not_called()
+        assert second == first
+        assert second.files_added == ["brand_new.yaml"]
+
+        await git_manager.commit_changes("Add file")
+        pending = await git_manager.get_pending_changes()
+        assert pending.has_changes is False
+
     async def test_with_new_file(self, git_manager: GitManager, config_dir: Path) -> None:
         await git_manager.commit_changes("Initial")
         (config_dir / "brand_new.yaml").write_text("data: true\n")
@@ -200,6 +488,23 @@ class TestGetPendingChanges:
         assert pending.has_changes is True
         assert pending.summary.total > 0
 
+    async def test_mixed_changes(self, git_manager: GitManager, config_dir: Path) -> None:
+        await git_manager.commit_changes("Initial")
+        (config_dir / "automations.yaml").unlink()
+        (config_dir / "configuration.yaml").write_text("homeassistant:\n  name: Mixed\n")
+        (config_dir / "added.yaml").write_text("a: 1\n")
+        pending = await git_manager.get_pending_changes()
+        assert pending.files_added == ["added.yaml"]
+        # Unstaged deletions are reported alongside modifications
+        assert sorted(pending.files_modified) == ["automations.yaml", "configuration.yaml"]
+        assert pending.summary.total == 3
+        # The diff stages every dirty path, deletions included, as a full patch
+        assert "diff --git a/automations.yaml b/automations.yaml\ndeleted file" in pending.diff
+        assert "-- id: a1" in pending.diff
+        assert "b/added.yaml" in pending.diff
+        assert "+a: 1" in pending.diff
+        assert "+  name: Mixed" in pending.diff
+
     async def test_repo_none_returns_empty(self, config_dir: Path) -> None:
         mgr = GitManager(config_dir)
         pending = await mgr.get_pending_changes()
@@ -218,10 +523,35 @@ class TestGetPendingChanges:
         """When get_diff raises during pending changes, diff is empty string."""
         await git_manager.commit_changes("Initial")
         (config_dir / "brand_new.yaml").write_text("data: true\n")
-        with patch.object(git_manager, "get_diff", side_effect=RuntimeError("diff failed")):
+        with patch.object(
+            git_manager, "_write_worktree_diff_sync", side_effect=RuntimeError("diff failed")
+        ):
             pending = await git_manager.get_pending_changes()
             assert pending.has_changes is True
             assert pending.diff == ""
+        # A failed diff is not cached
+        pending = await git_manager.get_pending_changes()
+        assert "b/brand_new.yaml" in pending.diff
+
+    async def test_diff_reuses_status_scan(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        await git_manager.commit_changes("Initial")
+        (config_dir / "brand_new.yaml").write_text("data: true\n")
+        with patch.object(git_manager, "_dirty_state", wraps=git_manager._dirty_state) as mock:
+            pending = await git_manager.get_pending_changes()
+        mock.assert_not_called()
+        assert "b/brand_new.yaml" in pending.diff
+
+    async def test_diff_expands_untracked_directory(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        await git_manager.commit_changes("Initial")
+        (config_dir / "pkg").mkdir()
+        (config_dir / "pkg" / "a.yaml").write_text("a: 1\n")
+        pending = await git_manager.get_pending_changes()
+        assert pending.has_changes is True
+        assert "b/pkg/a.yaml" in pending.diff
 
     async def test_pending_with_staged_and_unstaged_changes(
         self, git_manager: GitManager, config_dir: Path
@@ -315,10 +645,28 @@ class TestCheckpoint:
 
     async def test_checkpoint_exception(self, git_manager: GitManager) -> None:
         """Exception during checkpoint returns failure dict."""
-        with patch.object(git_manager, "commit_changes", side_effect=RuntimeError("fail")):
+        with patch.object(
+            git_manager, "_create_checkpoint_sync", side_effect=RuntimeError("fail")
+        ):
             result = await git_manager.create_checkpoint("test")
             assert result.success is False
 
+    async def test_commit_failure_falls_back_to_head(self, git_manager: GitManager) -> None:
+        await git_manager.commit_changes("Initial")
+        with patch.object(git_manager, "_commit_changes_sync", side_effect=RuntimeError("fail")):
+            result = await git_manager.create_checkpoint("test")
+        assert result.success is True
+        assert result.commit_hash == git_manager.repo.head().decode("ascii")[:8]
+
+    async def test_checkpoint_is_one_executor_job(self, git_manager: GitManager) -> None:
+        with patch.object(git_manager, "_run_blocking", wraps=git_manager._run_blocking) as mock:
+            result = await git_manager.create_checkpoint("test")
+        assert mock.call_count == 1
+        assert result.tag is not None
+        assert result.tag.encode() in {
+            ref.removeprefix(b"refs/tags/") for ref in git_manager.repo.refs.keys()
+        }
+
     async def test_tag_creation_failure_non_fatal(self, git_manager: GitManager) -> None:
         """Tag creation failure is logged but checkpoint still succeeds."""
         with patch(
@@ -330,8 +678,8 @@ class TestCheckpoint:
     async def test_checkpoint_head_fallback_fails(self, git_manager: GitManager) -> None:
         """When commit returns None AND HEAD lookup fails, commit_hash is None."""
         await git_manager.commit_changes("Initial")
-        # Patch commit_changes to return None, and head() to raise
-        with patch.object(git_manager, "commit_changes", return_value=None):
+        # Patch the commit to return None, and head() to raise
+        with patch.object(git_manager, "_commit_changes_sync", return_value=None):
             with patch.object(git_manager.repo, "head", side_effect=KeyError("no HEAD")):
                 result = await git_manager.create_checkpoint("test")
                 assert result.success is True
@@ -374,6 +722,26 @@ class TestGetDiff:
         diff = await git_manager.get_diff(commit1=commits[1], commit2=commits[0])
         assert isinstance(diff, str)
 
+    async def test_diff_accepts_short_hashes(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        sha1 = await git_manager.commit_changes("First")
+        (config_dir / "new.yaml").write_text("x: 1\n")
+        sha2 = await git_manager.commit_changes("Second")
+        assert sha1 and sha2
+        full = await git_manager.get_diff(commit1=sha1, commit2=sha2)
+        short = await git_manager.get_diff(commit1=sha1[:8], commit2=sha2[:8])
+        assert "new.yaml" in full
+        assert short == full
+
+    async def test_diff_of_identical_trees_is_empty(self, git_manager: GitManager) -> None:
+        sha = await git_manager.commit_changes("Only")
+        assert sha
+        with patch("aiocortex.git.manager.write_tree_diff") as mock_diff:
+            assert await git_manager.get_diff(commit1=sha, commit2=sha) == ""
+            assert await git_manager.get_diff(commit1=sha) == ""
+        mock_diff.assert_not_called()
+
     async def test_diff_from_single_commit(
         self, git_manager: GitManager, config_dir: Path
     ) -> None:
@@ -408,6 +776,95 @@ class TestGetDiff:
             assert diff == ""
 
 
+class TestStreamDiff:
+    @staticmethod
+    async def _two_commits(git_manager: GitManager, config_dir: Path) -> tuple[str, str]:
+        await git_manager.commit_changes("First")
+        (config_dir / "new.yaml").write_text("name: Café ☕\n" * 50)
+        await git_manager.commit_changes("Second")
+        walker = git_manager.repo.get_walker(max_entries=2)
+        second, first = (entry.commit.id.decode("ascii") for entry in walker)
+        return first, second
+
+    async def test_matches_get_diff(self, git_manager: GitManager, config_dir: Path) -> None:
+        first, second = await self._two_commits(git_manager, config_dir)
+        expected = await git_manager.get_diff(commit1=first, commit2=second)
+
+        # One-byte chunks split multi-byte characters across hand-offs
+        with patch("aiocortex.git.manager._DIFF_CHUNK_SIZE", 1):
+            chunks = [chunk async for chunk in git_manager.stream_diff(first, second)]
+        assert len(chunks) > 1
+        assert "".join(chunks) == expected
+        assert "Café ☕" in expected
+
+    async def test_early_close_stops_producer(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        first, second = await self._two_commits(git_manager, config_dir)
+        with (
+            patch("aiocortex.git.manager._DIFF_CHUNK_SIZE", 1),
+            patch("aiocortex.git.manager._DIFF_QUEUE_SIZE", 1),
+        ):
+            stream = git_manager.stream_diff(first, second)
+            assert await anext(stream)
+            await stream.aclose()
+
+    async def test_call_back_in_mid_stream_raises(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        first, second = await self._two_commits(git_manager, config_dir)
+        expected = await git_manager.get_diff(commit1=first, commit2=second)
+        with (
+            patch("aiocortex.git.manager._DIFF_CHUNK_SIZE", 1),
+            patch("aiocortex.git.manager._DIFF_QUEUE_SIZE", 1),
+        ):
+            stream = git_manager.stream_diff(first, second)
+            try:
+                chunks = [await anext(stream)]
+                # The producer holds the lock, blocked on the full queue
+                async with asyncio.timeout(5):
+                    with pytest.raises(GitError, match="drain or close"):
+                        await git_manager.rollback(first)
+                chunks.extend([chunk async for chunk in stream])
+            finally:
+                await stream.aclose()
+        assert "".join(chunks) == expected
+        # Usable again once the stream is drained
+        assert await git_manager.get_diff(commit1=first, commit2=second) == expected
+
+    async def test_other_tasks_wait_for_open_stream(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        first, second = await self._two_commits(git_manager, config_dir)
+        (config_dir / "other.yaml").write_text("a: 1\n")
+        with (
+            patch("aiocortex.git.manager._DIFF_CHUNK_SIZE", 1),
+            patch("aiocortex.git.manager._DIFF_QUEUE_SIZE", 1),
+        ):
+            stream = git_manager.stream_diff(first, second)
+            try:
+                assert await anext(stream)
+                commit = asyncio.create_task(git_manager.commit_changes("While streaming"))
+                await asyncio.sleep(0.1)
+                assert not commit.done()
+                _ = [chunk async for chunk in stream]
+            finally:
+                await stream.aclose()
+        async with asyncio.timeout(5):
+            assert await commit
+
+    async def test_repo_none_raises(self, config_dir: Path) -> None:
+        mgr = GitManager(config_dir)
+        with pytest.raises(GitNotInitializedError):
+            await anext(mgr.stream_diff())
+
+    async def test_failure_raises_git_error(self, git_manager: GitManager) -> None:
+        await git_manager.commit_changes("Initial")
+        with patch("aiocortex.git.manager.get_unstaged_changes", side_effect=RuntimeError("fail")):
+            with pytest.raises(GitError, match="Diff failed"):
+                _ = [chunk async for chunk in git_manager.stream_diff()]
+
+
 class TestRollback:
     async def test_rollback(self, git_manager: GitManager, config_dir: Path) -> None:
         sha1 = await git_manager.commit_changes("Original state")
@@ -463,6 +920,60 @@ class TestRestoreFilesFromCommit:
         )
         assert result.success is True
 
+    async def test_restore_overwrites_longer_file(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        sha1 = await git_manager.commit_changes("First")
+        assert sha1 is not None
+        target = config_dir / "configuration.yaml"
+        original = target.read_text()
+        target.write_text(original + "# a much longer trailing comment\n" * 20)
+        await git_manager.commit_changes("Longer")
+
+        result = await git_manager.restore_files_from_commit(
+            sha1, file_patterns=["configuration.yaml"]
+        )
+        assert result.restored_files == ["configuration.yaml"]
+        assert target.read_text() == original
+        assert (git_manager.shadow_root / "configuration.yaml").read_text() == original
+
+    async def test_restore_reads_repeated_blob_once(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        for name in ("a.yaml", "b.yaml", "c.yaml"):
+            (config_dir / name).write_text("shared: true\n")
+        sha1 = await git_manager.commit_changes("Copies")
+        assert sha1 is not None
+        store_type = type(git_manager.repo.object_store)
+        with patch.object(
+            store_type, "__getitem__", autospec=True, side_effect=store_type.__getitem__
+        ) as mock_get:
+            result = await git_manager.restore_files_from_commit(
+                sha1, file_patterns=["[abc].yaml"]
+            )
+        assert result.count == 3
+        shared_sha = Blob.from_string(b"shared: true\n").id
+        assert [call.args[1] for call in mock_get.call_args_list].count(shared_sha) == 1
+        assert (config_dir / "c.yaml").read_text() == "shared: true\n"
+
+    async def test_restore_does_not_cache_large_blobs(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        content = "key: value\n" * 1000
+        for name in ("a.yaml", "b.yaml"):
+            (config_dir / name).write_text(content)
+        sha1 = await git_manager.commit_changes("Large copies")
+        assert sha1 is not None
+        store_type = type(git_manager.repo.object_store)
+        with patch.object(
+            store_type, "__getitem__", autospec=True, side_effect=store_type.__getitem__
+        ) as mock_get:
+            result = await git_manager.restore_files_from_commit(sha1, file_patterns=["[ab].yaml"])
+        assert result.count == 2
+        large_sha = Blob.from_string(content.encode()).id
+        assert [call.args[1] for call in mock_get.call_args_list].count(large_sha) == 2
+        assert (config_dir / "b.yaml").read_text() == content
+
     async def test_restore_default_to_head(
         self, git_manager: GitManager, config_dir: Path
     ) -> None:
@@ -486,6 +997,43 @@ class TestRestoreFilesFromCommit:
         # No files match *.xyz, so none should be restored
         assert result.count == 0
 
+    async def test_restore_nested_pattern_after_non_matching_sibling(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        """A non-matching blob must not stop the walk before later matches."""
+        sub = config_dir / "esphome"
+        sub.mkdir(exist_ok=True)
+        (sub / "device.yaml").write_text("esphome:\n  name: test\n")
+        sha = await git_manager.commit_changes("With subdir")
+        (sub / "device.yaml").write_text("esphome:\n  name: changed\n")
+
+        result = await git_manager.restore_files_from_commit(sha, file_patterns=["esphome/*"])
+        assert result.restored_files == ["esphome/device.yaml"]
+        assert "name: test" in (sub / "device.yaml").read_text()
+
+    async def test_restore_skips_subtrees_outside_pattern_prefixes(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        for name in ("esphome", "packages"):
+            (config_dir / name).mkdir()
+            (config_dir / name / "a.yaml").write_text(f"{name}: 1\n")
+        (config_dir / "packages" / "deep").mkdir()
+        (config_dir / "packages" / "deep" / "b.yaml").write_text("b: 1\n")
+        sha = await git_manager.commit_changes("Subdirs")
+        assert sha
+
+        root = git_manager.repo[git_manager._resolve_commit_sha(sha)].tree
+        packages_tree = git_manager.repo[root][b"packages"][1]
+        store_type = type(git_manager.repo.object_store)
+        with patch.object(
+            store_type, "__getitem__", autospec=True, side_effect=store_type.__getitem__
+        ) as mock_get:
+            result = await git_manager.restore_files_from_commit(
+                sha, file_patterns=["esphome/*.yaml", "configuration.yaml"]
+            )
+        assert result.restored_files == ["configuration.yaml", "esphome/a.yaml"]
+        assert packages_tree not in [call.args[1] for call in mock_get.call_args_list]
+
     async def test_restore_failure_raises(self, git_manager: GitManager) -> None:
         await git_manager.commit_changes("First")
         with patch.object(git_manager.repo, "get_object", side_effect=KeyError("bad")):
@@ -521,6 +1069,26 @@ class TestCleanupCommits:
             assert "truncate fail" in result.message
 
 
+class TestResolveConfigPath:
+    def test_relative_and_leading_slash(self, git_manager: GitManager, config_dir: Path) -> None:
+        assert git_manager._resolve_config_path("a/b.yaml") == config_dir.resolve() / "a/b.yaml"
+        assert git_manager._resolve_config_path("/a.yaml") == config_dir.resolve() / "a.yaml"
+
+    @pytest.mark.parametrize("relative", ["../x.yaml", "a/../../x.yaml", "../config2/x.yaml"])
+    def test_rejects_escapes(self, git_manager: GitManager, relative: str) -> None:
+        with pytest.raises(GitError, match="outside config directory"):
+            git_manager._resolve_config_path(relative)
+
+    def test_rejects_symlink_escape(
+        self, git_manager: GitManager, config_dir: Path, tmp_path: Path
+    ) -> None:
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (config_dir / "link").symlink_to(outside)
+        with pytest.raises(GitError, match="outside config directory"):
+            git_manager._resolve_config_path("link/x.yaml")
+
+
 class TestTransactions:
     async def test_begin_stage_validate_commit(
         self,
@@ -544,6 +1112,116 @@ class TestTransactions:
         assert "configuration.yaml" in result.rollback_metadata.touched_paths
         assert "Transaction Home" in (config_dir / "configuration.yaml").read_text()
 
+    async def test_commit_reads_state_once(self, git_manager: GitManager) -> None:
+        transaction = await git_manager.begin_transaction()
+        await git_manager.stage_file_write(transaction.transaction_id, "new.yaml", "a: 1\n")
+        with (
+            patch.object(
+                git_manager, "_load_transaction_sync", wraps=git_manager._load_transaction_sync
+            ) as mock_load,
+            patch.object(
+                git_manager, "_save_transaction_sync", wraps=git_manager._save_transaction_sync
+            ) as mock_save,
+        ):
+            result = await git_manager.commit_transaction(transaction.transaction_id)
+        assert result.success is True
+        assert mock_load.call_count == 1
+        assert mock_save.call_count == 1
+        stored = git_manager._load_transaction_sync(transaction.transaction_id)
+        assert stored == result.transaction
+
+    async def test_commit_failure_persists_failed_state(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        transaction = await git_manager.begin_transaction()
+        await git_manager.stage_file_write(transaction.transaction_id, "new.yaml", "a: 1\n")
+        with patch.object(
+            git_manager, "_commit_changes_sync", side_effect=RuntimeError("commit broke")
+        ):
+            result = await git_manager.commit_transaction(transaction.transaction_id)
+        assert result.success is False
+        assert result.error == "commit broke"
+        assert not (config_dir / "new.yaml").exists()
+        stored = git_manager._load_transaction_sync(transaction.transaction_id)
+        assert stored.status == "failed"
+        assert stored.rollback_metadata.created_files == ["new.yaml"]
+
+    async def test_commit_many_operations(self, git_manager: GitManager, config_dir: Path) -> None:
+        transaction = await git_manager.begin_transaction()
+        tx_id = transaction.transaction_id
+        for index in range(5):
+            await git_manager.stage_file_write(tx_id, f"pkg/p{index}.yaml", f"i: {index}\n")
+        await git_manager.stage_file_write(tx_id, "configuration.yaml", "first: 1\n")
+        await git_manager.stage_file_write(tx_id, "configuration.yaml", "second: 2\n")
+        await git_manager.stage_file_delete(tx_id, "automations.yaml")
+
+        result = await git_manager.commit_transaction(tx_id)
+        assert result.success is True
+        assert (config_dir / "configuration.yaml").read_text() == "second: 2\n"
+        assert (config_dir / "pkg" / "p4.yaml").read_text() == "i: 4\n"
+        assert not (config_dir / "automations.yaml").exists()
+        metadata = result.rollback_metadata
+        assert len(metadata.touched_paths) == 8
+        assert metadata.created_files == [f"pkg/p{index}.yaml" for index in range(5)]
+        assert len(metadata.backup_files) == 2
+
+    async def test_failed_commit_restores_original_content(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        original = (config_dir / "configuration.yaml").read_text()
+        transaction = await git_manager.begin_transaction()
+        tx_id = transaction.transaction_id
+        await git_manager.stage_file_write(tx_id, "configuration.yaml", "first: 1\n")
+        await git_manager.stage_file_write(tx_id, "configuration.yaml", "second: 2\n")
+        with patch.object(git_manager, "_commit_changes_sync", side_effect=RuntimeError("x")):
+            result = await git_manager.commit_transaction(tx_id)
+        assert result.success is False
+        assert (config_dir / "configuration.yaml").read_text() == original
+
+    async def test_failed_commit_keeps_file_modes(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        (config_dir / "configuration.yaml").chmod(0o600)
+        (config_dir / "automations.yaml").chmod(0o640)
+        transaction = await git_manager.begin_transaction()
+        tx_id = transaction.transaction_id
+        await git_manager.stage_file_write(tx_id, "configuration.yaml", "changed: 1\n")
+        await git_manager.stage_file_delete(tx_id, "automations.yaml")
+        with patch.object(git_manager, "_commit_changes_sync", side_effect=RuntimeError("x")):
+            result = await git_manager.commit_transaction(tx_id)
+        assert result.success is False
+        assert (config_dir / "configuration.yaml").stat().st_mode & 0o777 == 0o600
+        assert (config_dir / "automations.yaml").stat().st_mode & 0o777 == 0o640
+        assert (config_dir / "automations.yaml").read_text() == "- id: a1\n  alias: Test\n"
+
+    async def test_large_write_staged_as_side_file(
+        self, git_manager: GitManager, config_dir: Path
+    ) -> None:
+        content = "sensor:\n" + "  - platform: template\n" * 400
+        transaction = await git_manager.begin_transaction()
+        tx_id = transaction.transaction_id
+        state = await git_manager.stage_file_write(tx_id, "big.yaml", content)
+        await git_manager.stage_file_write(tx_id, "small.yaml", "a: 1\n")
+
+        operation = state.operations[0]
+        assert operation.content is None
+        assert operation.content_ref is not None
+        assert content not in git_manager._transaction_file(tx_id).read_text()
+
+        result = await git_manager.commit_transaction(tx_id)
+        assert result.success is True
+        assert (config_dir / "big.yaml").read_text() == content
+        assert (config_dir / "small.yaml").read_text() == "a: 1\n"
+        assert not git_manager._blob_dir(tx_id).exists()
+
+    async def test_abort_removes_side_files(self, git_manager: GitManager) -> None:
+        transaction = await git_manager.begin_transaction()
+        tx_id = transaction.transaction_id
+        await git_manager.stage_file_write(tx_id, "big.yaml", "x" * 5000)
+        assert git_manager._blob_dir(tx_id).exists()
+        await git_manager.abort_transaction(tx_id)
+        assert not git_manager._blob_dir(tx_id).exists()
+
     async def test_abort_transaction(self, git_manager: GitManager) -> None:
         transaction = await git_manager.begin_transaction({"request": "delete"})
         await git_manager.stage_file_delete(transaction.transaction_id, "automations.yaml")
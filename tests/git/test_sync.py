@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
+import errno
+import os
+import time
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
-from aiocortex.git.sync import sync_config_to_shadow, sync_shadow_to_config
+from aiocortex.git import sync as sync_module
+from aiocortex.git.sync import (
+    _fast_copy,
+    config_tree_signature,
+    sync_config_to_shadow,
+    sync_shadow_to_config,
+)
 
 
 @pytest.fixture
@@ -38,6 +48,82 @@ def shadow_dir(tmp_path: Path) -> Path:
     return shadow
 
 
+@pytest.mark.skipif(sync_module._FICLONE is None, reason="FICLONE not available")
+class TestFastCopy:
+    @pytest.fixture(autouse=True)
+    def _reset_reflink_cache(self) -> Iterator[None]:
+        sync_module._no_reflink_devs.clear()
+        yield
+        sync_module._no_reflink_devs.clear()
+
+    def test_reflink_success_skips_copy2(self, tmp_path: Path) -> None:
+        src = tmp_path / "src.yaml"
+        src.write_text("a: 1\n")
+        os.utime(src, ns=(10**18, 10**18))
+        dst = tmp_path / "dst.yaml"
+
+        def fake_clone(dst_fd: int, _op: int, src_fd: int) -> int:
+            os.write(dst_fd, os.read(src_fd, 1024))
+            return 0
+
+        with (
+            patch("aiocortex.git.sync.fcntl.ioctl", side_effect=fake_clone),
+            patch("aiocortex.git.sync.shutil.copy2") as mock_copy2,
+        ):
+            _fast_copy(src, dst)
+        mock_copy2.assert_not_called()
+        assert dst.read_text() == "a: 1\n"
+        assert dst.stat().st_mtime_ns == 10**18
+
+    def test_unsupported_filesystem_is_remembered(self, tmp_path: Path) -> None:
+        src = tmp_path / "src.yaml"
+        src.write_text("a: 1\n")
+        unsupported = OSError(errno.EOPNOTSUPP, "not supported")
+        with patch("aiocortex.git.sync.fcntl.ioctl", side_effect=unsupported) as mock_ioctl:
+            _fast_copy(src, tmp_path / "one.yaml")
+            _fast_copy(src, tmp_path / "two.yaml")
+        mock_ioctl.assert_called_once()
+        assert (tmp_path / "two.yaml").read_text() == "a: 1\n"
+
+    def test_real_io_error_propagates(self, tmp_path: Path) -> None:
+        src = tmp_path / "src.yaml"
+        src.write_text("a: 1\n")
+        with patch("aiocortex.git.sync.fcntl.ioctl", side_effect=OSError(errno.EIO, "eio")):
+            with pytest.raises(OSError):
+                _fast_copy(src, tmp_path / "dst.yaml")
+
+
+class TestConfigTreeSignature:
+    def test_newest_covers_trackable_files(self, config_dir: Path) -> None:
+        target = config_dir / "esphome" / "device.yaml"
+        future_ns = time.time_ns() + 60 * 10**9
+        os.utime(target, ns=(future_ns, future_ns))
+        assert config_tree_signature(config_dir)[1] == future_ns
+
+    def test_detects_edit_with_older_mtime(self, config_dir: Path) -> None:
+        # Keep another file newest, so the edit stays below the newest mtime
+        future_ns = time.time_ns() + 60 * 10**9
+        os.utime(config_dir / "esphome" / "device.yaml", ns=(future_ns, future_ns))
+        target = config_dir / "configuration.yaml"
+        before = config_tree_signature(config_dir)
+        st = target.stat()
+        target.write_text("homeassistant:\n  name: Restored\n")
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+        after = config_tree_signature(config_dir)
+        assert after != before
+        assert after[1] == before[1]
+
+    def test_ignores_excluded_changes(self, config_dir: Path) -> None:
+        before = config_tree_signature(config_dir)
+        os.utime(config_dir / ".storage" / "core.config", ns=(before[1] + 10**9,) * 2)
+        assert config_tree_signature(config_dir) == before
+
+    def test_detects_deletion(self, config_dir: Path) -> None:
+        before = config_tree_signature(config_dir)
+        (config_dir / "esphome" / "device.yaml").unlink()
+        assert config_tree_signature(config_dir) != before
+
+
 class TestSyncConfigToShadow:
     def test_copies_included_files(self, config_dir: Path, shadow_dir: Path) -> None:
         sync_config_to_shadow(config_dir, shadow_dir)
@@ -79,12 +165,58 @@ class TestSyncConfigToShadow:
         assert (export / "data.yaml").exists()
 
     def test_copy_failure_is_non_fatal(self, config_dir: Path, shadow_dir: Path) -> None:
-        """copy2 failure logs warning but doesn't crash."""
-        with patch("aiocortex.git.sync.shutil.copy2", side_effect=OSError("copy failed")):
+        """Copy failure logs warning but doesn't crash."""
+        with patch("aiocortex.git.sync._fast_copy", side_effect=OSError("copy failed")):
             sync_config_to_shadow(config_dir, shadow_dir)
         # No files should have been copied
         assert not (shadow_dir / "configuration.yaml").exists()
 
+    def test_skips_files_already_current(self, config_dir: Path, shadow_dir: Path) -> None:
+        past_ns = time.time_ns() - 60 * 10**9
+        for path in config_dir.rglob("*"):
+            os.utime(path, ns=(past_ns, past_ns))
+        sync_config_to_shadow(config_dir, shadow_dir)
+
+        (config_dir / "automations.yaml").write_text("- id: a2\n")
+        with patch("aiocortex.git.sync._fast_copy", wraps=_fast_copy) as mock_copy:
+            tracked = sync_config_to_shadow(config_dir, shadow_dir)
+
+        assert [call.args[0].name for call in mock_copy.call_args_list] == ["automations.yaml"]
+        assert tracked == {"configuration.yaml", "automations.yaml", "esphome/device.yaml"}
+        assert (shadow_dir / "automations.yaml").read_text() == "- id: a2\n"
+
+    def test_recently_modified_files_are_recopied(
+        self, config_dir: Path, shadow_dir: Path
+    ) -> None:
+        sync_config_to_shadow(config_dir, shadow_dir)
+        with patch("aiocortex.git.sync._fast_copy", wraps=_fast_copy) as mock_copy:
+            sync_config_to_shadow(config_dir, shadow_dir)
+        assert mock_copy.call_count == 3
+
+    def test_does_not_follow_directory_symlinks(
+        self, config_dir: Path, shadow_dir: Path, tmp_path: Path
+    ) -> None:
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "leak.yaml").write_text("leak: true\n")
+        (config_dir / "linked").symlink_to(outside, target_is_directory=True)
+
+        tracked = sync_config_to_shadow(config_dir, shadow_dir)
+        assert tracked is not None
+        assert "linked/leak.yaml" not in tracked
+        assert not (shadow_dir / "linked").exists()
+
+    def test_copies_many_files_in_parallel(self, config_dir: Path, shadow_dir: Path) -> None:
+        pkg = config_dir / "packages"
+        pkg.mkdir()
+        for i in range(50):
+            (pkg / f"pkg_{i}.yaml").write_text(f"id: {i}\n")
+
+        sync_config_to_shadow(config_dir, shadow_dir)
+        copied = sorted(p.name for p in (shadow_dir / "packages").iterdir())
+        assert copied == sorted(f"pkg_{i}.yaml" for i in range(50))
+        assert (shadow_dir / "packages" / "pkg_7.yaml").read_text() == "id: 7\n"
+
     def test_obsolete_remove_failure_is_non_fatal(
         self, config_dir: Path, shadow_dir: Path
     ) -> None:
@@ -128,10 +260,53 @@ class TestSyncShadowToConfig:
         # Excluded files should not be touched
         assert (config_dir / "secrets.yaml").exists()
 
+    def test_delete_missing_reuses_config_paths(self, config_dir: Path, shadow_dir: Path) -> None:
+        """Tracked paths returned by sync_config_to_shadow skip the config walk."""
+        tracked = sync_config_to_shadow(config_dir, shadow_dir)
+        assert tracked is not None
+        assert "esphome/device.yaml" in tracked
+        (shadow_dir / "automations.yaml").unlink()
+
+        with patch("aiocortex.git.sync._walk_tracked_config_files") as mock_walk:
+            sync_shadow_to_config(
+                shadow_dir, config_dir, delete_missing=True, config_paths=tracked
+            )
+        mock_walk.assert_not_called()
+        assert not (config_dir / "automations.yaml").exists()
+        assert (config_dir / "configuration.yaml").exists()
+
+    def test_delete_missing_keeps_nested_git_dirs(
+        self, config_dir: Path, shadow_dir: Path
+    ) -> None:
+        nested_git = config_dir / "custom_components" / "foo" / ".git"
+        nested_git.mkdir(parents=True)
+        (nested_git / "HEAD").write_text("ref: refs/heads/main\n")
+        (config_dir / "custom_components" / "foo" / "manifest.yaml").write_text("a: 1\n")
+
+        tracked = sync_config_to_shadow(config_dir, shadow_dir)
+        assert tracked is not None
+        assert "custom_components/foo/manifest.yaml" in tracked
+        assert not any("/.git/" in p for p in tracked)
+
+        sync_shadow_to_config(shadow_dir, config_dir, delete_missing=True)
+        sync_shadow_to_config(shadow_dir, config_dir, delete_missing=True, config_paths=tracked)
+        assert (nested_git / "HEAD").exists()
+        assert (config_dir / "custom_components" / "foo" / "manifest.yaml").exists()
+
+    def test_delete_missing_with_only_paths(self, config_dir: Path, shadow_dir: Path) -> None:
+        sync_config_to_shadow(config_dir, shadow_dir)
+        (shadow_dir / "automations.yaml").unlink()
+
+        sync_shadow_to_config(
+            shadow_dir, config_dir, only_paths=["configuration.yaml"], delete_missing=True
+        )
+        assert not (config_dir / "automations.yaml").exists()
+        assert (config_dir / "configuration.yaml").exists()
+
     def test_copy_single_failure_is_non_fatal(self, config_dir: Path, shadow_dir: Path) -> None:
-        """copy2 failure in _copy_single logs warning but doesn't crash."""
+        """Copy failure in _copy_single logs warning but doesn't crash."""
         (shadow_dir / "a.yaml").write_text("a\n")
-        with patch("aiocortex.git.sync.shutil.copy2", side_effect=OSError("copy failed")):
+        with patch("aiocortex.git.sync._fast_copy", side_effect=OSError("copy failed")):
             sync_shadow_to_config(shadow_dir, config_dir, only_paths=["a.yaml"])
         # File shouldn't appear in config since copy failed
 
@@ -201,3 +376,27 @@ class TestSyncShadowToConfig:
         sync_config_to_shadow(config_dir, shadow_dir)
         # Export dir should be preserved
         assert (export / "exported.yaml").exists()
+
+
+class TestSyncChangedPaths:
+    def test_copies_only_changed_paths(self, config_dir: Path, shadow_dir: Path) -> None:
+        sync_config_to_shadow(config_dir, shadow_dir, changed_paths=["configuration.yaml"])
+        assert (shadow_dir / "configuration.yaml").exists()
+        assert not (shadow_dir / "automations.yaml").exists()
+
+    def test_removes_deleted_paths(self, config_dir: Path, shadow_dir: Path) -> None:
+        sync_config_to_shadow(config_dir, shadow_dir)
+        (config_dir / "esphome" / "device.yaml").unlink()
+
+        sync_config_to_shadow(config_dir, shadow_dir, changed_paths=["esphome/device.yaml"])
+        assert not (shadow_dir / "esphome" / "device.yaml").exists()
+        assert (shadow_dir / "automations.yaml").exists()
+
+    def test_skips_excluded_and_escaping_paths(self, config_dir: Path, shadow_dir: Path) -> None:
+        (config_dir.parent / "outside.yaml").write_text("nope\n")
+        sync_config_to_shadow(
+            config_dir,
+            shadow_dir,
+            changed_paths=["secrets.yaml", ".storage/core.config", "../outside.yaml"],
+        )
+        assert list(shadow_dir.iterdir()) == []
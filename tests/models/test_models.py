@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import json
+import sys
+
 import pytest
 from pydantic import ValidationError
 
@@ -42,6 +45,17 @@ class TestCortexResponse:
         r = CortexResponse(success=True, data={"count": 5})
         assert r.data == {"count": 5}
 
+    def test_to_bytes(self) -> None:
+        r = CortexResponse(success=True, data={"count": 5, "name": "Café"})
+        raw = r.to_bytes()
+        assert isinstance(raw, bytes)
+        assert json.loads(raw) == {
+            "success": True,
+            "message": None,
+            "data": {"count": 5, "name": "Café"},
+        }
+        assert raw == r.model_dump_json().encode()
+
 
 class TestAutomationConfig:
     def test_minimal(self) -> None:
@@ -218,3 +232,9 @@ class TestYamlPatchModels:
         )
         assert operation.op == "set"
         assert len(preview.conflicts) == 1
+
+    def test_patch_path_segments_interned(self) -> None:
+        segment = "".join(chr(code) for code in b"automation")
+        operation = YAMLPatchOperation(op="remove", path=[segment, 0])
+        assert operation.path[0] is sys.intern("automation")
+        assert operation.path[1] == 0
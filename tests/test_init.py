@@ -0,0 +1,33 @@
+"""Tests for the top-level package namespace."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+import aiocortex
+
+
+def test_import_is_lazy() -> None:
+    code = (
+        "import sys, aiocortex; "
+        "heavy = {'dulwich', 'yaml', 'pydantic', 'aiocortex.git', 'aiocortex.files'}; "
+        "print(sorted(heavy & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_all_names_resolve() -> None:
+    for name in aiocortex.__all__:
+        assert getattr(aiocortex, name) is not None
+    assert set(aiocortex.__all__) <= set(dir(aiocortex))
+
+
+def test_unknown_attribute() -> None:
+    with pytest.raises(AttributeError, match="no_such_name"):
+        _ = aiocortex.no_such_name